@@ -1,3 +1,5 @@
 
 from .automatic import Automatic
+from .async_automatic import AsyncAutomatic
+from .runner import FlowRunner, FlowResult
 from .common.utils import *
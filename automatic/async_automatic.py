@@ -0,0 +1,138 @@
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import Descriptor
+from .automatic import Automatic
+import pandas as pd
+
+from automatic.utils import Logger, LOGGER_AUTOMATIC
+
+logger = Logger.get(LOGGER_AUTOMATIC)
+
+# operations which don't wait the differ
+NO_DIFFER_OPS = ["go", "accept", "dismiss", "count"]
+
+
+class AsyncAutomatic(Automatic):
+    """
+    Awaitable front end of Automatic.
+
+    Operations are dispatched through the same cached entries and _run as
+    Automatic, so they share its dispatch cache and metrics, and run on a
+    worker thread, one op of an instance at a time, since a driver can't be
+    used from several threads at once. The differ before an operation is
+    awaited on the event loop, so many sessions can share one loop.
+
+    executor: shared by many instances instead of one thread each. Size it
+              to the number of sessions running at once.
+    """
+
+    def __init__(self, contexts, *, executor=None):
+        super().__init__(contexts)
+        self.__own_executor = executor is None
+        self.__executor = executor if executor else ThreadPoolExecutor(max_workers=1)
+        # ops of this instance don't overlap on a shared executor
+        self.__lock = threading.Lock()
+
+    def __locked(self, func, *args, **kwargs):
+        with self.__lock:
+            return func(*args, **kwargs)
+
+    def __run(self, entry, op, desc, skip_wait, *args, **kwargs):
+        if not skip_wait:
+            return self._run(entry, op, desc, *args, **kwargs)
+        ctx = entry[0]
+        ctx.skip_next_wait()
+        try:
+            return self._run(entry, op, desc, *args, **kwargs)
+        finally:
+            ctx.skip_next_wait(False)
+
+    async def __call(self, entry, op, desc: Descriptor, *args, **kwargs):
+        ctx = entry[0]
+        skip_wait = False
+        # a probe checks once without waiting, like the sync path
+        if op not in NO_DIFFER_OPS and not kwargs.get("probe") and hasattr(ctx, "differ"):
+            differ = ctx.differ(desc)
+            # a Settle is waited by the context, which can observe the page
+            if differ and isinstance(differ, (int, float)):
+                await asyncio.sleep(differ)
+                skip_wait = True
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, functools.partial(
+            self.__locked, self.__run, entry, op, desc, skip_wait, *args, **kwargs))
+
+    async def _ado(self, op, desc: Descriptor, *args, **kwargs):
+        logger.debug("%s on %s", op, desc)
+        entry = self._resolve(op, desc)
+        if not entry:
+            # fmt: off
+            raise Exception(f"Context cannot support type {type(desc)} of desc({desc})")
+            # fmt: on
+        return await self.__call(entry, op, desc, *args, **kwargs)
+
+    async def _aget(self, op, desc: Descriptor, *args, **kwargs):
+        logger.debug("%s on %s", op, desc)
+        entry = self._resolve(op, desc)
+        if not entry:
+            return None
+        return await self.__call(entry, op, desc, *args, **kwargs)
+
+    async def exist(self, desc: Descriptor, *, probe=False) -> bool:
+        if not probe:
+            return await self._ado("exist", desc)
+        return await self._ado("exist", desc, probe=probe)
+
+    async def go(self, desc: Descriptor):
+        return await self._ado("go", desc)
+
+    async def click(self, target: Descriptor):
+        return await self._ado("click", target)
+
+    async def text(self, target: Descriptor):
+        return await self._ado("text", target)
+
+    async def clicks(self, target: Descriptor, *, num_samples=None, batch=False, throttle=0):
+        if not batch:
+            return await self._ado("clicks", target, num_samples=num_samples)
+        return await self._ado("clicks", target, num_samples=num_samples,
+                               batch=batch, throttle=throttle)
+
+    async def type(self, desc: Descriptor, text):
+        return await self._ado("type", desc, text)
+
+    async def fill(self, values: dict, **kwargs) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, functools.partial(
+            self.__locked, super().fill, values, **kwargs))
+
+    async def table(self, desc: Descriptor) -> pd.DataFrame:
+        return await self._aget("table", desc)
+
+    async def accept(self, target: Descriptor):
+        return await self._ado("accept", target)
+
+    async def dismiss(self, target: Descriptor):
+        return await self._ado("dismiss", target)
+
+    async def select(self, target: Descriptor, text: str):
+        return await self._ado("select", target, text)
+
+    async def count(self, desc: Descriptor, *, probe=False) -> int:
+        if not probe:
+            return await self._ado("count", desc)
+        return await self._ado("count", desc, probe=probe)
+
+    def close(self):
+        if self.__own_executor:
+            self.__executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
@@ -2,8 +2,16 @@
 from .common import Descriptor
 from automatic.common.exceptions import *
 from .common.utils import package_name
+from .common.polling import poll
+from .utils.metrics import metrics
 import pandas as pd
+from contextlib import contextmanager, ExitStack
+from collections import OrderedDict
 import logging
+import time
+
+# ops of many steps(elements, pages, fields), bounding their own waits
+MULTI_STEP_OPS = ["clicks", "tables", "table_iter", "fill"]
 
 LOGGER_AUTOMATIC = "Automatic"
 logger = logging.getLogger(LOGGER_AUTOMATIC)
@@ -11,48 +19,145 @@ logger = logging.getLogger(LOGGER_AUTOMATIC)
 class Automatic:
     def __init__(self, contexts):
         self.__contexts = contexts
+        self.__packages = [(package_name(ctx), ctx) for ctx in contexts]
+        # descriptor class -> context
+        self.__contexts_by_type = {}
+        # (descriptor class, op) -> (context, bound method, context kind,
+        #                            descriptor name -> latency histogram)
+        self.__dispatch_table = {}
 
     def _context(self, desc: Descriptor):
-        for ctx in self.__contexts:
-            if package_name(desc) == package_name(ctx):
-                return ctx
-        return None
+        cls = desc.__class__
+        try:
+            return self.__contexts_by_type[cls]
+        except KeyError:
+            pass
+
+        package = package_name(desc)
+        ctx = None
+        for name, candidate in self.__packages:
+            if name == package:
+                ctx = candidate
+                break
+        self.__contexts_by_type[cls] = ctx
+        return ctx
+
+    def _method(self, context, op, desc: Descriptor = None):
+        method = getattr(context, op, None)
+        if not callable(method):
+            raise InvalidOperationException(
+                context, desc, op, f"{context.__class__.__module__} can not support op:{op}")
+        return method
+
+    def _bind(self, context, op, desc: Descriptor = None):
+        """
+        The op of the context, run within one deadline for the whole op
+        when the context supports it.
+        """
+        method = self._method(context, op, desc)
+        operation = getattr(context, "operation", None)
+        if not callable(operation) or op in MULTI_STEP_OPS:
+            return method
+
+        def bounded(desc, *args, **kwargs):
+            with operation(desc):
+                return method(desc, *args, **kwargs)
+        return bounded
+
+    def _resolve(self, op, desc: Descriptor):
+        """
+        (context, bound method, context kind, latency histograms) for the op
+        on the descriptor, or None when no context supports the descriptor.
+        """
+        key = (desc.__class__, op)
+        try:
+            return self.__dispatch_table[key]
+        except KeyError:
+            pass
+
+        ctx = self._context(desc)
+        entry = None
+        if ctx:
+            kind = package_name(ctx).split(".")[-1]
+            entry = (ctx, self._bind(ctx, op, desc), kind, {})
+        self.__dispatch_table[key] = entry
+        return entry
 
     def _dispatch(self, context, op, *args, **kwargs):
         if not context:
             # NoContextException
             return False
-        op = getattr(context, op, None)
-        if not op:
-            raise Exception(f"Context can not support op:{op}")
-
-        return op(*args, **kwargs)
+        desc = args[0] if args else None
+        return self._bind(context, op, desc)(*args, **kwargs)
 
     def _do(self, op, desc: Descriptor, *args, **kwargs):
         # dispatch context for a descriptor
-        logger.debug(f"{op} on {desc}")
-        ctx = self._context(desc)
-        if not ctx:
+        logger.debug("%s on %s", op, desc)
+        entry = self._resolve(op, desc)
+        if not entry:
             # fmt: off
             raise Exception(f"Context cannot support type {type(desc)} of desc({desc})")
             # fmt: on
 
         # Run operation in a context
-        return self._dispatch(ctx, op, desc, *args, **kwargs)
+        return self._run(entry, op, desc, *args, **kwargs)
 
     def _get(self, op, desc: Descriptor, *args, **kwargs):
-        logger.debug(f"{op} on {desc}")
+        logger.debug("%s on %s", op, desc)
         # dispatch context for a descriptor
-        ctx = self._context(desc)
-        if not ctx:
+        entry = self._resolve(op, desc)
+        if not entry:
             # NoContextException
             return None
 
         # Run operation in a context
-        return self._dispatch(ctx, op, desc, *args, **kwargs)
+        return self._run(entry, op, desc, *args, **kwargs)
+
+    def _run(self, entry, op, desc: Descriptor, *args, **kwargs):
+        _, method, kind, histograms = entry
+        if not metrics.enabled or not metrics.latency:
+            try:
+                return method(desc, *args, **kwargs)
+            except Exception:
+                metrics.inc("automatic_op_errors_total", op=op, context=kind)
+                raise
+
+        # labels are fixed per entry but the descriptor name,
+        # bulk ops(fill) get theirs from the op
+        name = desc.desc() if isinstance(desc, Descriptor) else op
+        hist = histograms.get(name)
+        if hist is None:
+            hist = histograms[name] = metrics.series(
+                "automatic_op_seconds", op=op, desc=name, context=kind)
+
+        start = time.perf_counter()
+        try:
+            return method(desc, *args, **kwargs)
+        except Exception:
+            metrics.inc("automatic_op_errors_total", op=op, context=kind)
+            raise
+        finally:
+            hist.observe(time.perf_counter() - start)
+
+    def _resolve_all(self, op, descs):
+        """
+        The dispatch entry of the op on descriptors which should belong to
+        one context.
+        """
+        entries = [self._resolve(op, desc) for desc in descs]
+        if not entries or not entries[0]:
+            raise Exception(f"Context cannot support descriptors({[str(d) for d in descs]})")
+        if any(not e or e[0] is not entries[0][0] for e in entries[1:]):
+            raise Exception(f"Descriptors should belong to one context({[str(d) for d in descs]})")
+        return entries[0]
 
-    def exist(self, desc: Descriptor) -> bool:
-        return self._do("exist", desc)
+    def exist(self, desc: Descriptor, *, probe=False) -> bool:
+        """
+        probe: check once without waiting
+        """
+        if not probe:
+            return self._do("exist", desc)
+        return self._do("exist", desc, probe=probe)
 
     def go(self, desc: Descriptor):
         return self._do("go", desc)
@@ -63,15 +168,46 @@ class Automatic:
     def text(self, target: Descriptor):
         return self._do("text", target)
 
-    def clicks(self, target: Descriptor, *, num_samples=None):
-        return self._do("clicks", target, num_samples=num_samples)
+    def clicks(self, target: Descriptor, *, num_samples=None, batch=False, throttle=0):
+        if not batch:
+            return self._do("clicks", target, num_samples=num_samples)
+        return self._do("clicks", target, num_samples=num_samples,
+                        batch=batch, throttle=throttle)
 
     def type(self, desc: Descriptor, text):
         return self._do("type", desc, text)
 
+    def fill(self, values: dict, **kwargs) -> dict:
+        """
+        Set the values of many fields, {descriptor: value}, with one bulk
+        operation per context. returns {descriptor: outcome}.
+        """
+        groups = {}
+        for desc, value in values.items():
+            entry = self._resolve("fill", desc)
+            if not entry:
+                raise Exception(f"Context cannot support type {type(desc)} of desc({desc})")
+            groups.setdefault(id(entry[0]), (entry, {}))[1][desc] = value
+
+        results = {}
+        for entry, fields in groups.values():
+            results.update(self._run(entry, "fill", fields, **kwargs))
+        return {desc: results[desc] for desc in values}
+
     def table(self, desc: Descriptor) -> pd.DataFrame:
         return self._get("table", desc)
 
+    def table_iter(self, desc: Descriptor, *, next: Descriptor = None,
+                   scroll: Descriptor = None, max_pages=None):
+        """
+        Yields DataFrame chunks of a paginated(next) or virtualized(scroll) table.
+        """
+        return self._do("table_iter", desc, next=next, scroll=scroll, max_pages=max_pages)
+
+    def tables(self, desc: Descriptor, *, next: Descriptor = None,
+               scroll: Descriptor = None, max_pages=None):
+        return self._do("tables", desc, next=next, scroll=scroll, max_pages=max_pages)
+
     def accept(self, target: Descriptor):
         return self._do("accept", target)
     
@@ -81,5 +217,71 @@ class Automatic:
     def select(self, target: Descriptor, text: str):
         return self._do("select", target, text)
 
-    def count(self, desc: Descriptor) -> int:
-        return self._do("count", desc)
+    def count(self, desc: Descriptor, *, probe=False) -> int:
+        """
+        probe: count once without waiting
+        """
+        if not probe:
+            return self._do("count", desc)
+        return self._do("count", desc, probe=probe)
+
+    def locate_many(self, descs, *, timeout=None, parallel=False):
+        """
+        All images found on one screen capture, [(descriptor, match)].
+        """
+        if not descs:
+            return []
+        _, method, _, _ = self._resolve_all("locate_many", descs)
+        return method(descs, timeout=timeout, parallel=parallel)
+
+    def first_of(self, descs, *, timeout=None, parallel=False):
+        """
+        The first of the descriptors found, (descriptor, handle). All of
+        them are polled in one loop, across contexts. When several are
+        found in the same attempt, the earliest in the list wins.
+
+        timeout: seconds. the longest timeout of the descriptors if not given.
+        parallel: match win32 images in a thread pool
+        """
+        if not descs:
+            return None
+        groups = OrderedDict()
+        for desc in descs:
+            ctx = self._context(desc)
+            if not ctx:
+                raise Exception(f"Context cannot support type {type(desc)} of desc({desc})")
+            groups.setdefault(id(ctx), (ctx, []))[1].append(desc)
+
+        kwargs = {"parallel": parallel} if parallel else {}
+        if len(groups) == 1:
+            ctx, group = next(iter(groups.values()))
+            return self._method(ctx, "first_of", group[0])(group, timeout=timeout, **kwargs)
+
+        if timeout is None:
+            timeout = max(ctx.timeout(d) or 0 for ctx, group in groups.values() for d in group)
+        order = {id(desc): i for i, desc in enumerate(descs)}
+        methods = [(self._method(ctx, "first_of", group[0]), group) for ctx, group in groups.values()]
+
+        def attempt():
+            hits = [method(group, timeout=0, **kwargs) for method, group in methods]
+            hits = [hit for hit in hits if hit]
+            return min(hits, key=lambda hit: order[id(hit[0])]) if hits else None
+
+        return poll(attempt, timeout=timeout)
+
+    @contextmanager
+    def snapshot(self):
+        """
+        Read-only ops(exist, count, text) are answered from a snapshot of
+        the page in the with block, on contexts supporting it.
+        """
+        with ExitStack() as stack:
+            for ctx in self.__contexts:
+                if hasattr(ctx, "snapshot"):
+                    stack.enter_context(ctx.snapshot())
+            yield self
+
+    def invalidate_snapshot(self):
+        for ctx in self.__contexts:
+            if hasattr(ctx, "invalidate_snapshot"):
+                ctx.invalidate_snapshot()
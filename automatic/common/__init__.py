@@ -4,5 +4,7 @@ from .parent import Parent
 from .descriptor import Descriptor
 from .component import Component
 from .context import Context
+from .polling import Deadline, Strategy, PollStats, poll
+from .settle import Settle, SettleStats
 from .utils import *
 from .exceptions import *
\ No newline at end of file
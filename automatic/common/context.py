@@ -1,15 +1,170 @@
 
 
 import time
+import threading
+from contextlib import contextmanager
 from abc import ABC, abstractmethod
 from .descriptor import Descriptor
+from .polling import Strategy, PollStats, Deadline, poll
+from .settle import Settle, SettleStats
+from .utils import wait, package_name
+from automatic.utils import Logger, LOGGER_AUTOMATIC
+from automatic.utils.metrics import metrics
+
+logger = Logger.get(LOGGER_AUTOMATIC)
 
 class Context():
-    def __init__(self):
-        self.__differ = 0
+    def __init__(self, *, timeout=None, differ=0, strategy: Strategy = None):
+        self.__timeout = timeout
+        self.__differ = differ
+        self.__strategy = strategy
+        self.__poll_stats = None
+        self.__settle_stats = SettleStats()
+        self.__local = threading.local()
+        # label of metrics. e.g. selenium, win32
+        self.__kind = package_name(self).split(".")[-1]
+
+    def kind(self) -> str:
+        return self.__kind
+
+    def timeout(self, desc: Descriptor = None):
+        """
+        Seconds an operation on the descriptor may wait for it.
+        """
+        timeout = desc.timeout() if isinstance(desc, Descriptor) else None
+        return timeout if timeout else self.__timeout
+
+    def differ(self, desc: Descriptor):
+        """
+        Seconds to wait before an operation on the descriptor, or a Settle.
+        """
+        differ = desc.differ() if isinstance(desc, Descriptor) else None
+        return differ if differ else self.__differ
+
+    @contextmanager
+    def operation(self, desc: Descriptor, *, probe=False):
+        """
+        One deadline shared by the parent activation, lookup and action of
+        an operation, so every poll in it waits only for what's left.
+        The budget is the timeout plus the differ of the descriptor.
+        A nested operation can only shorten the deadline.
+
+        probe: check once without waiting
+        """
+        outer = getattr(self.__local, "deadline", None)
+        outer_probe = getattr(self.__local, "probe", False)
+        differ = self.differ(desc)
+        differ = differ.timeout if isinstance(differ, Settle) else (differ or 0)
+        deadline = Deadline(0 if probe else (self.timeout(desc) or 0) + differ)
+        if outer and outer.end() < deadline.end():
+            deadline = outer
+        self.__local.deadline = deadline
+        self.__local.probe = probe or outer_probe
+        try:
+            yield deadline
+        finally:
+            self.__local.deadline = outer
+            self.__local.probe = outer_probe
+
+    def deadline(self) -> Deadline:
+        """
+        Deadline of the running operation on the current thread, or None.
+        """
+        return getattr(self.__local, "deadline", None)
+
+    def probing(self) -> bool:
+        """
+        The running operation is a probe, which checks once without waiting.
+        """
+        return getattr(self.__local, "probe", False)
+
+    def budget(self, timeout):
+        """
+        timeout bounded by the deadline of the running operation.
+        """
+        deadline = self.deadline()
+        if deadline is None:
+            return timeout
+        return min(timeout, deadline.remaining()) if timeout else deadline.remaining()
+
+    def skip_next_wait(self, skip=True):
+        """
+        The caller already waited the differ, e.g. AsyncAutomatic awaiting it
+        on the event loop. Applies to the next wait on the current thread.
+        """
+        self.__local.skip = skip
 
     def wait(self, desc: Descriptor):
-        differ = desc.differ()
-        differ = differ if differ else self.__differ
-        if differ != 0:
-            time.sleep(differ)
\ No newline at end of file
+        if getattr(self.__local, "skip", False):
+            self.__local.skip = False
+            return
+        if self.probing():
+            return
+        differ = self.differ(desc)
+        if isinstance(differ, Settle):
+            self.settle(desc, differ)
+        elif differ:
+            time.sleep(differ)
+            metrics.inc("automatic_differ_seconds_total", differ, context=self.__kind)
+
+    def settle(self, desc: Descriptor, settle: Settle) -> float:
+        """
+        Wait until the context is quiet for the descriptor, at most for
+        settle.timeout. returns seconds waited.
+        """
+        state = {}
+        deadline = Deadline(settle.timeout)
+        outer = self.deadline()
+        if outer and outer.end() < deadline.end():
+            deadline = outer
+        start = time.monotonic()
+        settled = poll(lambda: self._settled(desc, settle, state) or None, deadline=deadline,
+                       strategy=Strategy.fixed(settle.interval))
+        waited = time.monotonic() - start
+
+        self.__settle_stats.add(waited, settle.timeout, settled)
+        metrics.inc("automatic_differ_seconds_total", waited, context=self.__kind)
+        metrics.observe("automatic_settle_seconds", waited, context=self.__kind)
+        if not settled:
+            metrics.inc("automatic_settle_timeouts_total", context=self.__kind)
+        logger.debug(f"Settled in {waited:.3f}s. {settle}, settled={bool(settled)}, desc={desc}")
+        return waited
+
+    def _settled(self, desc: Descriptor, settle: Settle, state: dict) -> bool:
+        """
+        Whether nothing changed for settle.quiet. Contexts override it with
+        what they can observe. state is kept between the checks of a settle.
+        Without it, the quiet period is simply waited.
+        """
+        now = time.monotonic()
+        start = state.setdefault("start", now)
+        return now - start >= settle.quiet
+
+    def settle_stats(self) -> SettleStats:
+        """
+        Time actually waited by settles versus their configured timeouts.
+        """
+        return self.__settle_stats
+
+    def poll(self, func, *, timeout):
+        """
+        Wait until func succeeds with the polling strategy of this context,
+        for timeout or until the deadline of the running operation.
+        """
+        stats = PollStats()
+        self.__poll_stats = stats
+        deadline = Deadline(timeout)
+        outer = self.deadline()
+        if outer and outer.end() < deadline.end():
+            deadline = outer
+        try:
+            return wait(func, deadline=deadline, strategy=self.__strategy, stats=stats)
+        finally:
+            metrics.inc("automatic_poll_attempts_total", stats.attempts, context=self.__kind)
+            metrics.observe("automatic_poll_seconds", stats.elapsed, context=self.__kind)
+
+    def poll_stats(self) -> PollStats:
+        """
+        Stats(attempts, total wait, time-to-success) of the last poll.
+        """
+        return self.__poll_stats
@@ -0,0 +1,142 @@
+
+import time
+import random
+
+
+class Deadline:
+    """
+    A point in time an operation has to finish by.
+    """
+
+    def __init__(self, timeout):
+        self.__start = time.monotonic()
+        self.__end = self.__start + (timeout if timeout else 0)
+
+    @classmethod
+    def at(cls, end):
+        deadline = cls(0)
+        deadline.__end = end
+        return deadline
+
+    def end(self):
+        return self.__end
+
+    def remaining(self) -> float:
+        return max(0.0, self.__end - time.monotonic())
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.__start
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.__end
+
+
+class Strategy:
+    """
+    Intervals between attempts.
+
+    fast_probes: number of first retries done with fast_interval
+    initial: first interval after the fast probes
+    factor: growth of the interval for every next retry
+    max_interval: cap of the interval
+    jitter: random +/- ratio applied to every interval
+    """
+
+    def __init__(self, *, fast_probes=2, fast_interval=0.05, initial=0.1,
+                 factor=2.0, max_interval=1.0, jitter=0.1):
+        self.fast_probes = fast_probes
+        self.fast_interval = fast_interval
+        self.initial = initial
+        self.factor = factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+
+    @classmethod
+    def fixed(cls, interval):
+        return cls(fast_probes=0, initial=interval, factor=1.0,
+                   max_interval=interval, jitter=0)
+
+    def interval(self, retry) -> float:
+        """
+        retry: 0 for the interval after the first attempt
+        """
+        if retry < self.fast_probes:
+            interval = self.fast_interval
+        else:
+            exp = retry - self.fast_probes
+            interval = min(self.initial * (self.factor ** exp), self.max_interval)
+        if self.jitter:
+            interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(0.0, interval)
+
+
+DEFAULT_STRATEGY = Strategy()
+
+
+class PollStats:
+    def __init__(self):
+        self.attempts = 0
+        # time spent sleeping between attempts
+        self.total_wait = 0.0
+        self.elapsed = 0.0
+        # elapsed time until the successful attempt, None on timeout
+        self.time_to_success = None
+
+    def success(self) -> bool:
+        return self.time_to_success is not None
+
+    def to_dict(self):
+        return {
+            "attempts": self.attempts,
+            "total_wait": self.total_wait,
+            "elapsed": self.elapsed,
+            "time_to_success": self.time_to_success,
+        }
+
+    def __str__(self):
+        return (f"attempts={self.attempts}, total_wait={self.total_wait:.3f}, "
+                f"elapsed={self.elapsed:.3f}, time_to_success={self.time_to_success}")
+
+
+def _accepted(res) -> bool:
+    return res is not None and not (isinstance(res, (int, float)) and res == 0)
+
+
+def poll(func, *, timeout=None, deadline: Deadline = None, strategy: Strategy = None,
+         stats: PollStats = None):
+    """
+    Run func until it returns a value other than None/0 or the deadline passes.
+    The last attempt runs at the deadline, so timeout=0 tries exactly once.
+
+    func: task to be run. exceptions are considered as failure.
+    timeout: seconds. ignored when deadline is given.
+    strategy: intervals between attempts. DEFAULT_STRATEGY if not given.
+    stats: filled with attempts and timing of this call.
+    """
+    deadline = deadline if deadline else Deadline(timeout)
+    strategy = strategy if strategy else DEFAULT_STRATEGY
+    stats = stats if stats else PollStats()
+    start = time.monotonic()
+
+    res = None
+    while True:
+        stats.attempts += 1
+        try:
+            res = func()
+        except Exception:
+            res = None
+
+        if _accepted(res):
+            stats.time_to_success = time.monotonic() - start
+            break
+
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            break
+
+        interval = min(strategy.interval(stats.attempts - 1), remaining)
+        time.sleep(interval)
+        stats.total_wait += interval
+
+    stats.elapsed = time.monotonic() - start
+    return res
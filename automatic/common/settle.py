@@ -0,0 +1,51 @@
+
+class Settle:
+    """
+    Differ which waits until the page/screen is quiet, instead of a fixed
+    sleep. Used as the differ of a descriptor or a context.
+    e.g. Xpath("save", "//button", differ=Settle(0.3))
+
+    quiet: seconds without changes(DOM mutations, requests, pixels)
+    timeout: most seconds to wait. the operation goes on after it.
+    interval: seconds between checks
+    """
+
+    def __init__(self, quiet=0.2, *, timeout=5.0, interval=0.05):
+        self.quiet = quiet
+        self.timeout = timeout
+        self.interval = interval
+
+    def __str__(self):
+        return f"Settle(quiet={self.quiet}, timeout={self.timeout})"
+
+
+class SettleStats:
+    """
+    Time actually waited by settles versus their configured timeouts.
+    """
+
+    def __init__(self):
+        self.settles = 0
+        self.timeouts = 0
+        self.waited = 0.0
+        self.configured = 0.0
+
+    def add(self, waited, configured, settled):
+        self.settles += 1
+        self.waited += waited
+        self.configured += configured
+        if not settled:
+            self.timeouts += 1
+
+    def to_dict(self):
+        return {
+            "settles": self.settles,
+            "timeouts": self.timeouts,
+            "waited": self.waited,
+            "configured": self.configured,
+            "saved": self.configured - self.waited,
+        }
+
+    def __str__(self):
+        return (f"SettleStats(settles={self.settles}, timeouts={self.timeouts}, "
+                f"waited={self.waited:.3f}, configured={self.configured:.3f})")
@@ -1,12 +1,8 @@
 
-# WebDriver Manager (selenium 4)
-# https://pypi.org/project/webdriver-manager/#use-with-edge
+from .polling import poll, Strategy, PollStats
+from automatic.utils import Logger, LOGGER_AUTOMATIC
 
-from selenium import webdriver
-from selenium.webdriver.edge.service import Service
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
-
-import time
+logger = Logger.get(LOGGER_AUTOMATIC)
 
 
 def module_name(obj):
@@ -19,45 +15,24 @@ def package_name(obj):
 
 
 def create_driver(headless=False):
-    options = webdriver.EdgeOptions()
-    # level 3 is lowest value for log-level
-    options.add_argument('log-level=3')
-    if headless:
-        options.add_argument('headless')
-        options.add_argument('disable-gpu')
-
-    service = Service(EdgeChromiumDriverManager().install())
-    import time
-    time.sleep(1)
-    return webdriver.Edge(options=options, service=service)
+    # selenium.utils imports common, so import it here
+    from automatic.selenium.utils import create_driver
+    return create_driver(headless=headless)
 
 
-def wait(func, *, timeout, interval=0.5):
+def wait(func, *, timeout=None, deadline=None, interval=None, strategy=None, stats=None):
     """
     func: task to be run and it should have retun values which means success
     timeout: seconds to be wait until the task success
-    interval: time between each try.
+    deadline: polling.Deadline to be wait until, instead of timeout
+    interval: fixed time between each try. adaptive strategy if not given.
+    strategy: polling.Strategy for the intervals between tries
+    stats: polling.PollStats to be filled by this call
     """
-    start = time.time()
-    curr = 0
-    retry = 0
-    while True:
-        curr = time.time() - start
-        retry = retry + 1
-        try:
-            res = func()
-        except Exception as e:
-            res = None
-
-        if res != None and res != 0:
-            return res
-
-        if curr > timeout:
-            print(
-                f"Timeout! wait_until takes {curr}. timeout={timeout}, interval={interval}, retry={retry}")
-            break
-
-        # every 500ms
-        time.sleep(interval)
-
+    if interval:
+        strategy = Strategy.fixed(interval)
+    stats = stats if stats else PollStats()
+    res = poll(func, timeout=timeout, deadline=deadline, strategy=strategy, stats=stats)
+    if not stats.success():
+        logger.debug(f"Timeout! wait takes {stats.elapsed}. timeout={timeout}, {stats}")
     return res
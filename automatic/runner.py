@@ -0,0 +1,116 @@
+
+import time
+import pickle
+import multiprocessing.util
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List
+
+from .automatic import Automatic
+from .selenium.context import Context
+from .selenium.pool import SessionPool
+from .selenium.utils import create_driver
+
+from automatic.utils import Logger, LOGGER_AUTOMATIC
+
+logger = Logger.get(LOGGER_AUTOMATIC)
+
+
+def flow_name(flow) -> str:
+    return getattr(flow, "__name__", repr(flow))
+
+
+class FlowResult:
+    def __init__(self, name, *, result=None, error=None, elapsed=0.0):
+        self.name = name
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __str__(self):
+        status = "ok" if self.ok() else f"error={self.error!r}"
+        return f"{self.name}: {status}, elapsed={self.elapsed:.3f}"
+
+
+def _run(flow, automatic: Automatic) -> FlowResult:
+    start = time.monotonic()
+    try:
+        result = flow(automatic)
+        return FlowResult(flow_name(flow), result=result,
+                          elapsed=time.monotonic() - start)
+    except Exception as e:
+        logger.debug(f"Flow failed. flow={flow_name(flow)}, e={e}")
+        return FlowResult(flow_name(flow), error=e,
+                          elapsed=time.monotonic() - start)
+
+
+# A driver per worker process. drivers can't be sent between processes.
+_worker_context = None
+
+
+def _init_worker(headless, timeout, differ):
+    global _worker_context
+    driver = create_driver(headless=headless)
+    multiprocessing.util.Finalize(None, driver.quit, exitpriority=10)
+    _worker_context = Context(driver, timeout=timeout, differ=differ)
+
+
+def _run_in_worker(flow) -> FlowResult:
+    result = _run(flow, Automatic([_worker_context]))
+    try:
+        # errors come back pickled, and not every exception can be
+        pickle.dumps(result.error)
+    except Exception:
+        result.error = RuntimeError(repr(result.error))
+    return result
+
+
+class FlowRunner:
+    """
+    Runs independent flows across a number of browser sessions.
+
+    A flow is a callable receiving an Automatic for the session it runs on.
+    mode: "thread" shares one SessionPool between threads,
+          "process" starts a driver in each worker process. flows should be
+          picklable(module level functions) in this mode.
+    """
+
+    def __init__(self, size, *, mode="thread", headless=True, timeout=10, differ=0):
+        if mode not in ["thread", "process"]:
+            raise ValueError(f"mode should be thread or process. mode={mode}")
+        self.__size = size
+        self.__mode = mode
+        self.__headless = headless
+        self.__timeout = timeout
+        self.__differ = differ
+
+    def run(self, flows) -> List[FlowResult]:
+        """
+        Returns results in the order of flows.
+        """
+        flows = list(flows)
+        start = time.monotonic()
+        if self.__mode == "thread":
+            results = self.__run_threads(flows)
+        else:
+            results = self.__run_processes(flows)
+        logger.debug(f"{len(flows)} flows on {self.__size} sessions "
+                     f"took {time.monotonic() - start:.3f}s")
+        return results
+
+    def __run_threads(self, flows):
+        with SessionPool(self.__size, headless=self.__headless,
+                         timeout=self.__timeout, differ=self.__differ) as pool:
+            def task(flow):
+                with pool.session() as ctx:
+                    return _run(flow, Automatic([ctx]))
+
+            with ThreadPoolExecutor(max_workers=self.__size) as executor:
+                return list(executor.map(task, flows))
+
+    def __run_processes(self, flows):
+        with ProcessPoolExecutor(max_workers=self.__size, initializer=_init_worker,
+                                 initargs=(self.__headless, self.__timeout, self.__differ)) as executor:
+            return list(executor.map(_run_in_worker, flows))
@@ -1,5 +1,6 @@
 
 from .context import Context
 from .elements import *
-from .utils import create_driver
+from .utils import create_driver, driver_path, DriverFactory
+from .pool import SessionPool
 
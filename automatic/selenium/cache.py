@@ -0,0 +1,70 @@
+from selenium.webdriver.remote.webelement import WebElement
+
+from collections import OrderedDict
+from typing import Union
+
+from automatic.utils import Logger, LOGGER_AUTOMATIC
+
+logger = Logger.get(LOGGER_AUTOMATIC)
+
+
+class ElementCache:
+    """
+    Elements resolved for descriptors, keyed by descriptor identity, window
+    handle and frame path. Entries are revalidated with a staleness probe
+    by the context before use.
+
+    size: number of elements kept. 0 disables the cache.
+    """
+
+    def __init__(self, size=256):
+        self.__size = size
+        # (descriptor, handle, frame path) -> element
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__stale = 0
+
+    def enabled(self) -> bool:
+        return self.__size > 0
+
+    def get(self, key) -> Union[WebElement, None]:
+        elem = self.__entries.get(key)
+        if elem is not None:
+            self.__entries.move_to_end(key)
+        return elem
+
+    def put(self, key, elem: WebElement):
+        if not self.__size:
+            return
+        self.__entries[key] = elem
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__size:
+            self.__entries.popitem(last=False)
+
+    def discard(self, key):
+        self.__entries.pop(key, None)
+
+    def hit(self):
+        self.__hits += 1
+
+    def miss(self, stale=False):
+        self.__misses += 1
+        if stale:
+            self.__stale += 1
+
+    def invalidate(self):
+        """
+        Forget every element, e.g. after a navigation.
+        """
+        self.__entries.clear()
+
+    def stats(self):
+        lookups = self.__hits + self.__misses
+        return {
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "stale": self.__stale,
+            "size": len(self.__entries),
+            "hit_ratio": self.__hits / lookups if lookups else 0.0,
+        }
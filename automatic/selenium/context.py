@@ -1,22 +1,21 @@
-import os
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.select import Select
+from selenium.common.exceptions import StaleElementReferenceException
 
 
-# wait elements
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-# exception
-from selenium.common.exceptions import TimeoutException
-
 # types
 from typing import Union, List
 
 from .elements import *
-from ..common import wait
+from .resolver import Resolver
+from .windows import WindowIndex
+from .cache import ElementCache
+from .snapshot import Snapshot, SnapshotStore
+from . import snapshot as snapshots
+from .scripts import *
 import automatic.common as common
+from ..common.polling import Strategy
 from ..common.exceptions import *
 import time
 
@@ -26,8 +25,13 @@ import random
 # table
 import pandas as pd
 from io import StringIO
+import hashlib
+from collections import deque, OrderedDict
+from contextlib import contextmanager
 
 from automatic.utils import Logger, LOGGER_AUTOMATIC
+from automatic.utils.metrics import metrics
+from automatic.utils.capture import capture_writer
 
 def get_or(a, b) -> int:
     return a if a else b
@@ -35,12 +39,43 @@ def get_or(a, b) -> int:
 logger = Logger.get(LOGGER_AUTOMATIC)
 
 class Context(common.Context):
-    def __init__(self, driver: WebDriver, *, timeout, differ):
+    def __init__(self, driver: WebDriver, *, timeout, differ, strategy: Strategy = None,
+                 cache_size=256):
+        """
+        cache_size: elements kept for repeated ops on the same descriptor. 0 disables it.
+        """
+        super().__init__(timeout=timeout, differ=differ, strategy=strategy)
         self.__driver = driver
         self.__current_frame = None
+        self.__frame_path = ()
+        self.__active_window = None
+        self.__active_chain = None
         self.__default_window_handle = driver.current_window_handle
         self.__timeout = timeout
-        self.__differ = differ
+        self.__count_commands(driver)
+        self.__resolver = Resolver(driver)
+        self.__windows = WindowIndex(driver, self.__get_current_window_handle,
+                                     on_rebuild=self.__on_windows_rebuilt)
+        self.__elements = ElementCache(cache_size)
+        # cache key of the element validated by the last activation probe
+        self.__validated = None
+        self.__snapshots = SnapshotStore()
+
+    def __count_commands(self, driver: WebDriver):
+        """
+        Count every WebDriver command, which is a round trip to the driver.
+        """
+        execute = getattr(driver, "execute", None)
+        if not execute or getattr(driver, "_automatic_counted", False):
+            return
+        kind = self.kind()
+
+        def counted(driver_command, params=None):
+            metrics.inc("automatic_webdriver_commands_total", command=driver_command, context=kind)
+            return execute(driver_command, params)
+
+        driver.execute = counted
+        driver._automatic_counted = True
 
     def get(self, desc: Descriptor):
         if is_element(desc):
@@ -61,44 +96,105 @@ class Context(common.Context):
             return None
 
     def get_element(self, desc: Descriptor) -> Union[WebElement, None]:
-        timeout = get_or(desc.timeout(), self.__timeout)
+        key = self.__cache_key(desc)
+        if key is not None:
+            elem = self.__cached(key, desc)
+            if elem is not None:
+                return elem
         try:
-            if hasattr(desc, 'clickable') and desc.clickable:
-                return WebDriverWait(self.__driver, timeout).until(
-                    EC.element_to_be_clickable((desc.by(), desc.path())))
+            es = self.get_elements(desc)
+            if len(es) == 0:
+                logger.debug("Failed to find an element")
+                return None
+            elif hasattr(desc, 'clickable') and desc.clickable:
+                # the first clickable one, like EC.element_to_be_clickable
+                elem = es[0]
+            elif len(es) > 1:
+                logger.debug("Multiple items are found")
+                logger.debug(f"elements: [{es}]")
+                return None
             else:
-                es = self.get_elements(desc)
-                if len(es) == 0:
-                    logger.debug("Failed to find an element")
-                    return None
-                elif len(es) > 1:
-                    logger.debug("Multiple items are found")
-                    logger.debug(f"elements: [{es}]")
-                    return None
-                else:
-                    return es[0]
-        except TimeoutException:
-            return None
+                elem = es[0]
+            if key is not None:
+                self.__elements.put(key, elem)
+            return elem
         except Exception as e:
             logger.debug(f"ERROR: Failed to get an element. type={type(e)} e={e}")
             return None
 
+    def __cache_key(self, desc: Descriptor):
+        # only while the window/frame is tracked, so the key is where the element is
+        if not self.__elements.enabled() or self.__active_chain is None:
+            return None
+        return (desc, self.__active_window, self.__frame_path)
+
+    def __alive(self, desc: Descriptor, elem: WebElement) -> bool:
+        # the lookup runs again in the same script, so the element still
+        # matches the descriptor(and is its only match, like get_element)
+        clickable = getattr(desc, 'clickable', False)
+        filter = getattr(desc, 'visible', True) or clickable
+        return bool(self.__driver.execute_script(
+            ALIVE_SCRIPT, elem, desc.by(), desc.path(), filter, not clickable))
+
+    def __cached(self, key, desc: Descriptor) -> Union[WebElement, None]:
+        """
+        The cached element if it's still valid, without a lookup.
+        """
+        elem = self.__elements.get(key)
+        if elem is None:
+            self.__elements.miss()
+            metrics.inc("automatic_element_cache_total", context=self.kind(), result="miss")
+            return None
+
+        valid = key == self.__validated
+        if not valid:
+            try:
+                valid = self.__alive(desc, elem)
+            except Exception as e:
+                logger.debug(f"Cached element is stale. e={e}")
+        if valid:
+            self.__elements.hit()
+            metrics.inc("automatic_element_cache_total", context=self.kind(), result="hit")
+            return elem
+
+        self.__elements.discard(key)
+        self.__elements.miss(stale=True)
+        metrics.inc("automatic_element_cache_total", context=self.kind(), result="stale")
+        return None
+
+    def cache_stats(self):
+        """
+        Hits, misses and stale entries of the element cache.
+        """
+        return self.__elements.stats()
+
     def get_elements(self, desc: Descriptor) -> List[WebElement]:
+        """
+        Lookup and visible/enabled filtering run in the browser, so each
+        poll costs one round trip regardless of how many elements match.
+        """
         timeout = get_or(desc.timeout(), self.__timeout)
+        visible = not hasattr(desc, 'visible') or desc.visible
+        clickable = hasattr(desc, 'clickable') and desc.clickable
+        self.__resolver.begin()
+        start = time.perf_counter()
         try:
-            if hasattr(desc, 'visible') and not desc.visible:
-                return WebDriverWait(self.__driver, timeout).until(
-                    lambda d: [element for element in
-                            d.find_elements(desc.by(), desc.path())])
-            else:    
-                return WebDriverWait(self.__driver, timeout).until(
-                    lambda d: [element for element in
-                            d.find_elements(desc.by(), desc.path())
-                            if element.is_displayed() and element.is_enabled()
-                                ])
+            elems = self.poll(lambda: self.__resolver.find(
+                desc.by(), desc.path(), filter=visible or clickable) or None, timeout=timeout)
+            return elems if elems else []
         except Exception as e:
             logger.debug(f"ERROR: Failed to get elements.{type(e)} {e}")
             return []
+        finally:
+            logger.debug(f"lookup round trips: {self.__resolver.round_trips()}")
+            metrics.observe("automatic_phase_seconds", time.perf_counter() - start,
+                            context=self.kind(), phase="lookup")
+
+    def lookup_round_trips(self) -> int:
+        """
+        How many WebDriver round trips the last element lookup used.
+        """
+        return self.__resolver.round_trips()
 
     def get_window_handle(self, desc: Descriptor):
         timeout = get_or(desc.timeout(), self.__timeout)
@@ -117,36 +213,28 @@ class Context(common.Context):
             self.set_default_window()
             return self.__driver.current_window_handle
 
+    def __on_windows_rebuilt(self):
+        # indexing switched through every window, so no frame is active anymore
+        self.invalidate_activation()
+        self.__current_frame = None
+        self.__frame_path = ()
+
     def __get_window_handle_with_title(self, title, timeout):
-        def _get_window_handle(driver: WebDriver, title: str):
-            current = self.__get_current_window_handle()
-            result = None
-            handles = driver.window_handles
-            # handles.remove(current)
-            for handle in handles:
-                driver.switch_to.window(handle)
-                if driver.title.find(title) >= 0:
-                    result = handle
-                    break
-            driver.switch_to.window(current)
-            return result
-        return wait(lambda: _get_window_handle(self.__driver, title), timeout=timeout)
+        return self.__find_window("title", title, timeout)
 
     def __get_window_handle_with_url(self, url, timeout):
-        def _get_window_handle(driver: WebDriver, title: str):
-            current = self.__get_current_window_handle()
-            result = None
-            handles = driver.window_handles
-            # handles.remove(current)
-            for handle in handles:
-                driver.switch_to.window(handle)
-                if driver.current_url.find(url) >= 0:
-                    result = handle
-                    break
-            driver.switch_to.window(current)
-            return result
+        return self.__find_window("url", url, timeout)
+
+    def __find_window(self, by, value, timeout):
+        # every window is read again at most once per lookup, on its first
+        # miss. later attempts only read windows which may have changed.
+        attempts = []
+
+        def attempt():
+            attempts.append(None)
+            return self.__windows.find(by, value, rescan=len(attempts) == 1)
 
-        return wait(lambda: _get_window_handle(self.__driver, url), timeout=timeout)
+        return self.poll(attempt, timeout=timeout)
 
     def close_other_windows(self):
         """
@@ -161,14 +249,17 @@ class Context(common.Context):
             self.__driver.switch_to.window(handle)
             self.__driver.close()
         self.__driver.switch_to.window(current)
+        self.__windows.invalidate()
+        self.__elements.invalidate()
+        self.__changed()
+        self.__on_windows_rebuilt()
 
     def get_alert(self, desc: Descriptor):
         timeout = get_or(desc.timeout(), self.__timeout)
         try:
-            WebDriverWait(self.__driver, timeout).until(
-                EC.alert_is_present(), "Can not find an alert window")
-
-            alert = self.__driver.switch_to.alert
+            alert = self.poll(lambda: self.__driver.switch_to.alert, timeout=timeout)
+            if not alert:
+                return None
             if not desc.path() in alert.text:
                 return None
             return alert
@@ -193,20 +284,87 @@ class Context(common.Context):
     def __activate_window(self, desc):
         handle = self.get_window_handle(desc)
         self.set_current_window(handle)
+        # frames of a window are entered from its top
+        self.set_default_frame()
 
+    def __chain(self, desc: Descriptor, isParent):
+        """
+        Parents to activate for the descriptor, from the root.
+        """
+        chain = []
+        curr = desc if isParent else desc.parent()
+        while curr:
+            chain.insert(0, curr)
+            curr = curr.parent()
+        return tuple(chain)
+
+    def __chain_key(self, desc: Descriptor):
+        """
+        Parents of the descriptor as a key of its window/frame.
+        """
+        # any DefaultFrame instance is the same top document
+        return tuple("default frame" if is_default_frame(p) else p
+                     for p in self.__chain(desc, False))
+
+    def __is_active(self, chain, desc: Descriptor = None) -> bool:
+        if self.__active_chain is None or self.__active_chain != chain:
+            return False
+
+        # The staleness probe of a cached element proves the window/frame too
+        key = self.__cache_key(desc) if desc else None
+        elem = self.__elements.get(key) if key is not None else None
+        if elem is not None:
+            try:
+                if self.__alive(desc, elem):
+                    self.__validated = key
+                return True
+            except StaleElementReferenceException:
+                # from an old document. the plain probe tells about the frame
+                self.__elements.discard(key)
+            except Exception as e:
+                logger.debug(f"Activation state is stale. e={e}")
+                self.invalidate_activation()
+                return False
+
+        # A closed window or a detached(stale) frame fails this probe.
+        try:
+            self.__driver.execute_script("return 1;")
+            return True
+        except Exception as e:
+            logger.debug(f"Activation state is stale. e={e}")
+            self.invalidate_activation()
+            return False
+
+    def invalidate_activation(self):
+        """
+        Forget the tracked window/frame, so the next op activates its parents.
+        """
+        self.__active_chain = None
+        self.__validated = None
+
+    def active_state(self):
+        """
+        (window handle, frame path) the driver is activated for.
+        """
+        return self.__active_window, self.__frame_path
 
     def __activate(self, desc: Descriptor, isParent=False):
         if not desc:
             return
 
-        # activate a parent
-        parent = desc.parent()
-        if parent:
-            self.__activate(parent, True)
+        with metrics.timer("automatic_phase_seconds", context=self.kind(), phase="activate"):
+            self.__validated = None
+            chain = self.__chain(desc, isParent)
+            if self.__is_active(chain, None if isParent else desc):
+                return
 
-        if not isParent:
-            return 
+            self.invalidate_activation()
+            for parent in chain:
+                self.__activate_parent(parent)
+            self.__active_window = self.__get_current_window_handle()
+            self.__active_chain = chain
 
+    def __activate_parent(self, desc: Descriptor):
         # parent: Default frame
         if is_default_frame(desc):
             self.set_default_window()
@@ -226,6 +384,7 @@ class Context(common.Context):
                 if not desc.parent():
                     self.set_default_window()
                 self.set_current_frame(elem)
+                self.__frame_path = self.__frame_path + (desc,)
 
         else:
             raise InvalidOperationException(self, desc, "activate")
@@ -260,18 +419,91 @@ class Context(common.Context):
         return True
 
 
+# ----------------------
+# ----- SNAPSHOT -------
+# ----------------------
+
+    def set_snapshot_mode(self, enabled=True):
+        """
+        In snapshot mode, exist/count/text of Xpath/Id/Name descriptors are
+        answered from one page_source parse per window/frame. Ops which may
+        change the page drop the snapshots.
+        """
+        self.__snapshots.enable(enabled)
+
+    @contextmanager
+    def snapshot(self):
+        """
+        Snapshot mode in a with block.
+        """
+        enabled = self.__snapshots.enabled()
+        self.set_snapshot_mode(True)
+        try:
+            yield self
+        finally:
+            self.set_snapshot_mode(enabled)
+
+    def invalidate_snapshot(self):
+        """
+        Drop the snapshots, so the next query pulls the page again.
+        """
+        self.__snapshots.invalidate()
+
+    def snapshot_stats(self):
+        return self.__snapshots.stats()
+
+    def __changed(self):
+        # the page may change from here
+        self.__snapshots.invalidate()
+        self.__windows.changed()
+
+    def __snapshot(self, desc: Descriptor) -> Union[Snapshot, None]:
+        """
+        Snapshot of the window/frame of the descriptor in snapshot mode.
+        """
+        if not self.__snapshots.enabled() or not is_element(desc):
+            return None
+        chain = self.__chain_key(desc)
+        snapshot = self.__snapshots.get(chain)
+        if snapshot is None:
+            self.__activate(desc)
+            snapshot = self.__snapshots.put(chain, self.__driver.page_source)
+        return snapshot
+
+    def __snapshot_elements(self, snapshot: Snapshot, desc: Descriptor):
+        filter = getattr(desc, 'visible', True) or getattr(desc, 'clickable', False)
+        return snapshot.find(desc.by(), desc.path(), filter=filter)
+
+    def __snapshot_element(self, snapshot: Snapshot, desc: Descriptor):
+        es = self.__snapshot_elements(snapshot, desc)
+        if not es or (len(es) > 1 and not getattr(desc, 'clickable', False)):
+            return None
+        return es[0]
+
 # ----------------------
 # ------ CLICKS --------
 # ----------------------
 
 
     def __differ_time(self, desc: Descriptor):
-        differ = desc.differ()
-        differ = differ if differ else self.__differ
-        if differ != 0:
-            time.sleep(differ)
+        self.wait(desc)
+
+    def _settled(self, desc: Descriptor, settle, state: dict) -> bool:
+        """
+        The document of the descriptor is loaded, has no pending fetch/XHR
+        and no DOM mutation for settle.quiet.
+        """
+        try:
+            if desc.parent():
+                self.__activate(desc)
+            ready, pending, quiet = self.__driver.execute_script(SETTLE_SCRIPT)
+        except Exception as e:
+            logger.debug(f"Failed to check the page settled. e={e}")
+            return False
+        return ready == "complete" and not pending and quiet >= settle.quiet * 1000
 
     def click(self, descriptor: Descriptor):
+        self.__changed()
         self.__differ_time(descriptor)
 
         self.__activate(descriptor)
@@ -286,8 +518,14 @@ class Context(common.Context):
         if not self.__click(elem):
             raise OperationFailureException(self, descriptor, "click")
 
-    def clicks(self, descriptor: Descriptor, *, num_samples=None):
+    def clicks(self, descriptor: Descriptor, *, num_samples=None, batch=False, throttle=0):
+        """
+        batch: click all elements from one injected script and return
+               per-element success. The differ is waited once.
+        throttle: seconds between clicks in batch mode, waited in the page.
+        """
         
+        self.__changed()
         self.__differ_time(descriptor)
 
         # activate
@@ -302,6 +540,9 @@ class Context(common.Context):
         if num_samples:
             elems = random.sample(elems, k=num_samples)
 
+        if batch:
+            return self.__batch_clicks(descriptor, elems, throttle)
+
         # execution
         for elem in elems:
             # differ
@@ -309,10 +550,41 @@ class Context(common.Context):
             if not self.__click(elem):
                 raise OperationFailureException(self, descriptor, "click")
 
+    def __batch_clicks(self, descriptor: Descriptor, elems: List[WebElement], throttle):
+        restore = None
+        try:
+            if not throttle:
+                results = self.__driver.execute_script(CLICKS_SCRIPT, elems)
+            else:
+                # the script should be allowed to run through all delays
+                needed = len(elems) * throttle + self.__timeout
+                current = self.__driver.timeouts.script
+                if current < needed:
+                    self.__driver.set_script_timeout(needed)
+                    restore = current
+                results = self.__driver.execute_async_script(
+                    ASYNC_CLICKS_SCRIPT, elems, int(throttle * 1000))
+        except Exception as e:
+            logger.error(f"Failed to run batch clicks. e={e}")
+            raise OperationFailureException(self, descriptor, "clicks")
+        finally:
+            # other async scripts of the session keep their timeout
+            if restore is not None:
+                try:
+                    self.__driver.set_script_timeout(restore)
+                except Exception as e:
+                    logger.debug(f"Failed to restore the script timeout. e={e}")
+
+        failed = len([r for r in results if not r])
+        if failed:
+            logger.warning(f"{failed}/{len(results)} clicks failed. desc={descriptor}")
+        return results
+
 # ---------------------
 # ------ TYPES --------
 # ---------------------
     def type(self, desc: Descriptor, text):
+        self.__changed()
         self.__differ_time(desc)
 
         # activate
@@ -328,9 +600,90 @@ class Context(common.Context):
         if not self.__type(elem, text):
             raise OperationFailureException(self, desc, "type")
 
+    def fill(self, values: dict, *, keystrokes=()):
+        """
+        Set the values of many fields, {descriptor: value}, within the
+        timeout of the first one.
+
+        Fields under the same window/frame are looked up and set by one
+        injected script, which fires input and change events. A field the
+        script can't set(not found yet, contenteditable, file, ...) falls
+        back to the lookup and keystrokes of type(). Checkboxes and radio
+        buttons are checked for truthy values(True, "true", "on", "1", ...)
+        and never typed into.
+
+        keystrokes: descriptors always typed with real keystrokes
+        returns: {descriptor: outcome}, outcome is one of
+                 "set": set by the script
+                 "typed": typed with keystrokes
+                 "missing": not found
+                 "ambiguous": more than one element matches
+                 "failed": found but not set
+        """
+        if not values:
+            return {}
+        first = next(iter(values))
+        # one deadline for all the fields, the fallback lookups of missing
+        # ones share what's left of it instead of waiting a timeout each
+        with self.operation(first):
+            self.__changed()
+            self.__differ_time(first)
+
+            # fields by their parents, in the given order
+            groups = OrderedDict()
+            for desc, value in values.items():
+                groups.setdefault(self.__chain(desc, False), []).append((desc, value))
+
+            results = {}
+            for fields in groups.values():
+                results.update(self.__fill_group(fields, keystrokes))
+        logger.debug(f"fill: {len(values)} fields in {len(groups)} groups")
+        return results
+
+    def __fill_group(self, fields, keystrokes):
+        self.__activate(fields[0][0])
+
+        scripted = [(d, v) for d, v in fields if is_element(d) and d not in keystrokes]
+        fallback = [(d, v, None) for d, v in fields if not is_element(d) or d in keystrokes]
+        outcomes = {}
+        if scripted:
+            # booleans stay booleans for checkboxes
+            args = [[d.by(), d.path(), getattr(d, 'visible', True) or getattr(d, 'clickable', False),
+                     getattr(d, 'clickable', False), v if isinstance(v, bool) else str(v)]
+                    for d, v in scripted]
+            try:
+                rows = self.__driver.execute_script(FILL_SCRIPT, args)
+            except Exception as e:
+                logger.debug(f"Failed to run fill script. e={e}")
+                rows = [["error", None]] * len(scripted)
+
+            for (desc, value), (status, elem) in zip(scripted, rows):
+                if status in ["set", "ambiguous", "failed"]:
+                    outcomes[desc] = status
+                else:
+                    fallback.append((desc, value, elem))
+
+        for desc, value, elem in fallback:
+            outcomes[desc] = self.__fill_field(desc, value, elem)
+        return {desc: outcomes[desc] for desc, _ in fields}
+
+    def __fill_field(self, desc: Descriptor, value, elem: WebElement = None):
+        if elem is None:
+            self.__activate(desc)
+            elem = self.get(desc)
+        if not isinstance(elem, WebElement):
+            return "missing"
+        # keystrokes don't check a box
+        if (elem.get_attribute("type") or "").lower() in ["checkbox", "radio"]:
+            return "failed"
+        return "typed" if self.__type(elem, str(value)) else "failed"
+
     def __table(self, elem: WebElement):
+        return self.__read_table(elem.get_attribute('outerHTML'))
+
+    def __read_table(self, html: str):
         try:
-            return pd.read_html(StringIO(elem.get_attribute('outerHTML')))[0]
+            return pd.read_html(StringIO(html))[0]
         except ValueError as e:
             logger.warning(f"Can't read table from given element. e={e}")
             return None
@@ -347,6 +700,105 @@ class Context(common.Context):
         # TODO: validate its tag is table
         return self.__table(elem)
 
+    def __table_html(self, desc: Descriptor):
+        self.__activate(desc)
+        elem = self.get(desc)
+        return elem.get_attribute('outerHTML') if elem else None
+
+    def __wait_table_changed(self, desc: Descriptor, html: str, timeout) -> bool:
+        changed = self.poll(lambda: self.__table_html(desc) != html or None,
+                            timeout=timeout)
+        return True if changed else False
+
+    def __next_page(self, next: Descriptor) -> bool:
+        self.__activate(next)
+        elem = self.get(next)
+        if not elem or elem.get_attribute('aria-disabled') == 'true':
+            return False
+        self.__changed()
+        return self.__click(elem)
+
+    def __scroll(self, scroll: Descriptor) -> bool:
+        self.__activate(scroll)
+        elem = self.get(scroll)
+        if not elem:
+            return False
+        self.__changed()
+        return self.__driver.execute_script(
+            "var e = arguments[0], before = e.scrollTop;"
+            "e.scrollTop = before + e.clientHeight;"
+            "return e.scrollTop > before;", elem)
+
+    def table_iter(self, desc: Descriptor, *, next: Descriptor = None,
+                   scroll: Descriptor = None, max_pages=None, history=1000):
+        """
+        Yields a DataFrame chunk per loaded page of a paginated or
+        virtualized table.
+
+        next: element to click for the next page. Stops when it is gone,
+              disabled or the table doesn't change after the click.
+        scroll: scroll container of a virtualized table. It is scrolled by
+              its height until it can't scroll anymore. Rows already
+              yielded are dropped from later chunks.
+        max_pages: maximum number of pages to read
+        history: number of page/row hashes remembered for deduplication,
+              which bounds the memory for very large tables.
+        """
+        self.__differ_time(desc)
+        timeout = get_or(desc.timeout(), self.__timeout)
+
+        seen_pages = deque(maxlen=history)
+        seen_rows = OrderedDict()
+        pages = 0
+        while True:
+            html = self.__table_html(desc)
+            if html is None:
+                if pages == 0:
+                    raise ElementNotFoundException(self, desc, "table_iter")
+                break
+
+            key = hashlib.sha1(html.encode("utf-8")).hexdigest()
+            if key not in seen_pages:
+                seen_pages.append(key)
+                df = self.__read_table(html)
+                if df is not None and scroll:
+                    df = self.__new_rows(df, seen_rows, history)
+                if df is not None and len(df) > 0:
+                    yield df
+
+            pages += 1
+            if max_pages and pages >= max_pages:
+                break
+
+            if next:
+                if not self.__next_page(next):
+                    break
+            elif scroll:
+                if not self.__scroll(scroll):
+                    break
+            else:
+                break
+
+            if not self.__wait_table_changed(desc, html, timeout):
+                break
+
+    def __new_rows(self, df: pd.DataFrame, seen_rows: OrderedDict, history):
+        hashes = pd.util.hash_pandas_object(df, index=False).tolist()
+        keep = []
+        for h in hashes:
+            keep.append(h not in seen_rows)
+            seen_rows[h] = True
+            seen_rows.move_to_end(h)
+            if len(seen_rows) > history:
+                seen_rows.popitem(last=False)
+        return df[keep].reset_index(drop=True)
+
+    def tables(self, desc: Descriptor, **kwargs):
+        """
+        All chunks of table_iter in a list.
+        """
+        return list(self.table_iter(desc, **kwargs))
+
 # ---------------------
 # ------ select--------
 # ---------------------
@@ -359,7 +811,7 @@ class Context(common.Context):
         return True
 
     def select(self, desc: Descriptor, text):
-
+        self.__changed()
         self.__differ_time(desc)
 
         # activate
@@ -381,6 +833,7 @@ class Context(common.Context):
         elem = self.get(desc)
         if not elem:
             raise ElementNotFoundException(self, desc, "accept")
+        self.__changed()
         logger.debug(f"accept: {elem.text}")
         elem.accept()
         
@@ -390,12 +843,14 @@ class Context(common.Context):
         elem = self.get(desc)
         if not elem:
             raise ElementNotFoundException(self, desc, "dismiss")
+        self.__changed()
         logger.debug(f"dismiss: {elem.text}")
         elem.dismiss()
 
     def execute_script(self, script, element):
         if not (script and element):
             return False
+        self.__changed()
         self.__driver.execute_script(script, element)
         return True
 
@@ -407,6 +862,10 @@ class Context(common.Context):
 
         if target.by() == "url":
             self.__driver.get(target.path())
+            self.__windows.invalidate()
+            self.__elements.invalidate()
+            self.__changed()
+            self.invalidate_activation()
             return True
         else:
             # NotSupportedDescriptor
@@ -416,38 +875,54 @@ class Context(common.Context):
         return self.__driver.current_url
 
     def set_current_window(self, handle):
+        self.invalidate_activation()
         try:
             if self.__driver.current_window_handle == handle:
                 return
         except:
             pass
         self.__driver.switch_to.window(handle)
+        # switching windows leaves any frame
+        self.__current_frame = None
+        self.__frame_path = ()
 
     def set_default_window(self):
-        try:
-            if self.__driver.current_window_handle == self.__default_window_handle:
-                return
-        except:
-            pass
-        self.__driver.switch_to.window(self.__default_window_handle)
+        self.set_current_window(self.__default_window_handle)
 
     def set_current_frame(self, frame: WebElement):
+        self.invalidate_activation()
         if frame:
             self.__current_frame = frame
             self.__driver.switch_to.frame(frame)
         else:
             self.__current_frame = None
+            self.__frame_path = ()
             self.__driver.switch_to.default_content()
 
     def set_default_frame(self):
+        self.invalidate_activation()
         if self.__current_frame:
             self.__driver.switch_to.default_content()
+            self.__current_frame = None
+            self.__frame_path = ()
 
-    def exist(self, desc: Descriptor) -> bool:
+    def exist(self, desc: Descriptor, *, probe=False) -> bool:
         """ 
         Special case not to rasie exception. So need to call lower-level APIs
+
+        probe: check once without waiting for the descriptor or its parents
         """
+        with self.operation(desc, probe=probe):
+            return self.__exist(desc)
+
+    def __exist(self, desc: Descriptor) -> bool:
         try:
+            snapshot = self.__snapshot(desc)
+            if snapshot:
+                if isinstance(desc, Xpath) and desc.multiple:
+                    return True if self.__snapshot_elements(snapshot, desc) else False
+                return self.__snapshot_element(snapshot, desc) is not None
+
             self.__differ_time(desc)
             self.__activate(desc)
             if isinstance(desc, Xpath) and desc.multiple:
@@ -459,11 +934,21 @@ class Context(common.Context):
         except:
             return False
 
-    def count(self, desc: Descriptor) -> int:
+    def count(self, desc: Descriptor, *, probe=False) -> int:
         """
         return How many elements for the descriptor
+
+        probe: count once without waiting for the descriptor or its parents
         """
+        with self.operation(desc, probe=probe):
+            return self.__count(desc)
+
+    def __count(self, desc: Descriptor) -> int:
         try:
+            snapshot = self.__snapshot(desc)
+            if snapshot:
+                return len(self.__snapshot_elements(snapshot, desc))
+
             self.__activate(desc)
             elems = self.get_all(desc)
             return len(elems) if elems else 0
@@ -472,7 +957,74 @@ class Context(common.Context):
             return 0
         
 
+    def first_of(self, descs: List[Descriptor], *, timeout=None, parallel=False):
+        """
+        The first of the descriptors(in the given order) found, polled in
+        one loop. Elements under the same window/frame are checked together
+        by one script.
+
+        timeout: seconds. the longest timeout of the descriptors if not given.
+        parallel: ignored, the browser checks a group in one script anyway
+        returns: (descriptor, element/window handle/alert) or None
+        """
+        if not descs:
+            return None
+        if timeout is None:
+            timeout = max(self.timeout(d) or 0 for d in descs)
+
+        # element candidates by window/frame, and the others
+        groups = OrderedDict()
+        for index, desc in enumerate(descs):
+            key = self.__chain_key(desc) if is_element(desc) else ("other", index)
+            groups.setdefault(key, []).append((index, desc))
+        return self.poll(lambda: self.__first_once(groups), timeout=timeout)
+
+    def __first_once(self, groups):
+        found = None
+        for key, group in groups.items():
+            # a group after the found one can't be earlier
+            if found and group[0][0] > found[0]:
+                continue
+            with self.operation(group[0][1], probe=True):
+                hit = self.__probe_group(group) if key[0] != "other" else self.__probe_one(*group[0])
+            if hit and (not found or hit[0] < found[0]):
+                found = hit
+        return (found[1], found[2]) if found else None
+
+    def __probe_group(self, group):
+        try:
+            self.__activate(group[0][1])
+            candidates = [[d.by(), d.path(),
+                           getattr(d, 'visible', True) or getattr(d, 'clickable', False),
+                           not (getattr(d, 'clickable', False) or getattr(d, 'multiple', False))]
+                          for _, d in group]
+            res = self.__driver.execute_script(FIRST_OF_SCRIPT, candidates)
+        except Exception as e:
+            logger.debug(f"Failed to probe candidates. e={e}")
+            return None
+        if not res:
+            return None
+        index, desc = group[res[0]]
+        return (index, desc, res[1])
+
+    def __probe_one(self, index, desc: Descriptor):
+        try:
+            if desc.parent() and not is_alert(desc):
+                self.__activate(desc)
+            handle = self.get(desc)
+        except Exception as e:
+            logger.debug(f"Failed to probe a candidate. e={e}")
+            return None
+        return (index, desc, handle) if handle else None
+
     def text(self, desc: Descriptor) -> str:
+        snapshot = self.__snapshot(desc)
+        if snapshot:
+            elem = self.__snapshot_element(snapshot, desc)
+            if elem is None:
+                raise ElementNotFoundException(self, desc, "text")
+            return snapshots.text(elem)
+
         self.__differ_time(desc)
 
         self.__activate(desc)
@@ -486,34 +1038,21 @@ class Context(common.Context):
     def capture(self, base_filename="capture"):
         """
         Captures the current DOM and a screenshot of the page.
-        Files are saved in the ~/.iaa/log/ directory.
+        Files are written to the ~/.iaa/log/ directory in background.
         """
-        # Ensure the log directory exists
-        log_dir = os.path.join(os.path.expanduser("~"), ".iaa", "log")
-        os.makedirs(log_dir, exist_ok=True)
-
-        # Define file paths
-        dom_filepath = os.path.join(log_dir, f"{base_filename}.html")
-        screenshot_filepath = os.path.join(log_dir, f"{base_filename}.png")
+        session = getattr(self.__driver, "session_id", None) or f"{id(self):x}"
+        files = {}
 
         # Capture DOM
         try:
-            with open(dom_filepath, "w", encoding="utf-8") as dom_file:
-                dom_file.write(self.__driver.page_source)
-            logger.info(f"DOM saved to {dom_filepath}")
+            files["html"] = self.__driver.page_source
         except Exception as e:
             logger.error(f"Failed to save DOM: {e}")
 
         # Capture screenshot
         try:
-            if self.__driver.save_screenshot(screenshot_filepath):
-                logger.info(f"Screenshot saved to {screenshot_filepath}")
-            else:
-                logger.error("Failed to save screenshot")
+            files["png"] = self.__driver.get_screenshot_as_png()
         except Exception as e:
             logger.error(f"Failed to capture screenshot: {e}")
 
-        return [dom_filepath, screenshot_filepath]
-
-
-
+        return capture_writer().submit(session, base_filename, files)
@@ -0,0 +1,82 @@
+
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from .context import Context
+from .utils import create_driver
+
+from automatic.utils import Logger, LOGGER_AUTOMATIC
+
+logger = Logger.get(LOGGER_AUTOMATIC)
+
+
+class SessionPool:
+    """
+    A fixed number of selenium Contexts, each with its own driver.
+
+    size: number of sessions
+    factory: creates a driver. create_driver by default.
+    """
+
+    def __init__(self, size, *, headless=True, timeout=10, differ=0,
+                 factory=None, strategy=None):
+        if size < 1:
+            raise ValueError(f"size should be positive. size={size}")
+        factory = factory if factory else lambda: create_driver(headless=headless)
+        self.__lock = threading.Lock()
+        self.__idle = queue.Queue()
+        self.__contexts = []
+        self.__closed = False
+
+        # drivers start in parallel. startup dominates for large pools.
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = [executor.submit(factory) for _ in range(size)]
+        drivers = [f.result() for f in futures if not f.exception()]
+        errors = [f.exception() for f in futures if f.exception()]
+        if errors:
+            for driver in drivers:
+                driver.quit()
+            raise errors[0]
+
+        for driver in drivers:
+            ctx = Context(driver, timeout=timeout, differ=differ, strategy=strategy)
+            self.__contexts.append((ctx, driver))
+            self.__idle.put(ctx)
+
+    def size(self) -> int:
+        return len(self.__contexts)
+
+    def acquire(self, timeout=None) -> Context:
+        if self.__closed:
+            raise RuntimeError("SessionPool is closed")
+        return self.__idle.get(timeout=timeout)
+
+    def release(self, ctx: Context):
+        self.__idle.put(ctx)
+
+    @contextmanager
+    def session(self, timeout=None):
+        ctx = self.acquire(timeout)
+        try:
+            yield ctx
+        finally:
+            self.release(ctx)
+
+    def close(self):
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+        for _, driver in self.__contexts:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f"Failed to quit a driver. e={e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,82 @@
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from typing import List
+
+# find(by, path, filter): elements of the descriptor, filtered on
+# displayed/enabled in the browser. Shared by the injected scripts.
+FIND_FUNCTION = """
+function displayed(e) {
+    // like isDisplayed: options of a closed dropdown have no client rects
+    var tag = e.tagName.toLowerCase();
+    if (tag === 'option' || tag === 'optgroup') {
+        var select = e.closest('select, datalist');
+        return !!select && select.tagName.toLowerCase() === 'select' && displayed(select);
+    }
+    if (!e.getClientRects().length) { return false; }
+    var style = window.getComputedStyle(e);
+    if (style.visibility === 'hidden' || style.visibility === 'collapse') { return false; }
+    for (var p = e; p && p.nodeType === 1; p = p.parentElement) {
+        if (window.getComputedStyle(p).opacity === '0') { return false; }
+    }
+    return true;
+}
+function enabled(e) {
+    return !(e.matches && e.matches(':disabled'));
+}
+function find(by, path, filter) {
+    var found = [];
+    if (by === 'xpath') {
+        var r = document.evaluate(path, document, null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < r.snapshotLength; i++) { found.push(r.snapshotItem(i)); }
+    } else if (by === 'id') {
+        found = Array.prototype.slice.call(
+            document.querySelectorAll('[id="' + path.replace(/"/g, '\\\\"') + '"]'));
+    } else if (by === 'name') {
+        found = Array.prototype.slice.call(document.getElementsByName(path));
+    }
+    found = found.filter(function (e) { return e.nodeType === 1; });
+    if (!filter) { return found; }
+    return found.filter(function (e) { return displayed(e) && enabled(e); });
+}
+"""
+
+# Runs the lookup and the visible/enabled filtering inside the browser.
+# arguments: by, path, filter
+FIND_ELEMENTS_SCRIPT = FIND_FUNCTION + """
+return find(arguments[0], arguments[1], arguments[2]);
+"""
+
+
+class Resolver:
+    """
+    Resolves element descriptors with a single execute_script per lookup.
+    """
+
+    def __init__(self, driver: WebDriver):
+        self.__driver = driver
+        self.__round_trips = 0
+        self.__total_round_trips = 0
+
+    def begin(self):
+        """
+        Reset the round trip counter. Called once per lookup.
+        """
+        self.__round_trips = 0
+
+    def find(self, by: str, path: str, *, filter=True) -> List[WebElement]:
+        self.__round_trips += 1
+        self.__total_round_trips += 1
+        elems = self.__driver.execute_script(FIND_ELEMENTS_SCRIPT, by, path, filter)
+        return elems if elems else []
+
+    def round_trips(self) -> int:
+        """
+        Number of WebDriver round trips used by the last lookup.
+        """
+        return self.__round_trips
+
+    def total_round_trips(self) -> int:
+        return self.__total_round_trips
@@ -0,0 +1,143 @@
+
+# Scripts injected by the selenium Context.
+
+from .resolver import FIND_FUNCTION
+
+# arguments: elements
+# returns: per-element success
+CLICKS_SCRIPT = """
+var elems = arguments[0], results = [];
+for (var i = 0; i < elems.length; i++) {
+    try { elems[i].click(); results.push(true); } catch (e) { results.push(false); }
+}
+return results;
+"""
+
+# arguments: elements, delay(ms) between clicks, callback
+# returns: per-element success
+ASYNC_CLICKS_SCRIPT = """
+var elems = arguments[0], delay = arguments[1], done = arguments[arguments.length - 1];
+var results = [];
+function next(i) {
+    if (i >= elems.length) { done(results); return; }
+    try { elems[i].click(); results.push(true); } catch (e) { results.push(false); }
+    setTimeout(function () { next(i + 1); }, delay);
+}
+next(0);
+"""
+
+# arguments: fields [[by, path, filter, first, value], ...]
+# returns: [status, element] per field. status is one of
+#   set: the value is set and input/change events are fired
+#   keys: found, but needs real keystrokes(e.g. contenteditable, file)
+#   failed: found, but the page kept its state(e.g. a cancelled checkbox click)
+#   missing, ambiguous, error
+FILL_SCRIPT = FIND_FUNCTION + """
+var fields = arguments[0], results = [];
+var SETTABLE = ['text', 'search', 'email', 'url', 'tel', 'password', 'number',
+                'date', 'time', 'datetime-local', 'month', 'week', 'color', 'range', ''];
+var CHECKABLE = ['checkbox', 'radio'];
+function truthy(value) {
+    return value === true ||
+        ['true', 'on', '1', 'yes', 'checked'].indexOf(String(value).toLowerCase()) >= 0;
+}
+function setValue(e, value) {
+    // the native setter, so frameworks tracking the value see the change
+    var prop = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(e), 'value');
+    if (prop && prop.set) { prop.set.call(e, value); } else { e.value = value; }
+}
+function selectOption(e, value) {
+    for (var i = 0; i < e.options.length; i++) {
+        var o = e.options[i];
+        if (o.text.trim() === value || o.value === value) { e.selectedIndex = i; return true; }
+    }
+    return false;
+}
+for (var i = 0; i < fields.length; i++) {
+    var f = fields[i];
+    try {
+        var found = find(f[0], f[1], f[2]);
+        if (!found.length) { results.push(['missing', null]); continue; }
+        if (found.length > 1 && !f[3]) { results.push(['ambiguous', null]); continue; }
+        var e = found[0], tag = e.tagName.toLowerCase();
+        var type = (e.getAttribute('type') || '').toLowerCase();
+        if (tag === 'input' && CHECKABLE.indexOf(type) >= 0) {
+            // a click fires click/input/change like a user's
+            var on = truthy(f[4]);
+            if (e.checked !== on) { e.click(); }
+            results.push([e.checked === on ? 'set' : 'failed', e]);
+            continue;
+        } else if (tag === 'select') {
+            if (!selectOption(e, f[4])) { results.push(['keys', e]); continue; }
+        } else if (tag === 'textarea' ||
+                   (tag === 'input' && SETTABLE.indexOf(type) >= 0)) {
+            if (e.readOnly) { results.push(['keys', e]); continue; }
+            setValue(e, f[4]);
+        } else {
+            results.push(['keys', e]);
+            continue;
+        }
+        e.dispatchEvent(new Event('input', {bubbles: true}));
+        e.dispatchEvent(new Event('change', {bubbles: true}));
+        results.push(['set', e]);
+    } catch (err) {
+        results.push(['error', null]);
+    }
+}
+return results;
+"""
+
+# arguments: element, by, path, filter, single
+# returns: the descriptor still finds the element, and only it if single
+ALIVE_SCRIPT = FIND_FUNCTION + """
+var e = arguments[0];
+if (!e || !e.isConnected) { return false; }
+var found = find(arguments[1], arguments[2], arguments[3]);
+return found.indexOf(e) >= 0 && (!arguments[4] || found.length === 1);
+"""
+
+# arguments: candidates [[by, path, filter, single], ...]
+# returns: [index, element] of the first candidate found, or null.
+#   a single candidate matching several elements isn't found.
+FIRST_OF_SCRIPT = FIND_FUNCTION + """
+var candidates = arguments[0];
+for (var i = 0; i < candidates.length; i++) {
+    var c = candidates[i], found = find(c[0], c[1], c[2]);
+    if (found.length && (found.length === 1 || !c[3])) { return [i, found[0]]; }
+}
+return null;
+"""
+
+# Installs a MutationObserver and fetch/XHR counters once per document.
+# requests started before the first call aren't counted.
+# returns: [document.readyState, pending requests, ms since the last change]
+SETTLE_SCRIPT = """
+var w = window, s = w.__automaticSettle;
+if (!s) {
+    s = w.__automaticSettle = {pending: 0, last: Date.now()};
+    var touch = function () { s.last = Date.now(); };
+    var done = function () { s.pending = Math.max(0, s.pending - 1); touch(); };
+    new MutationObserver(touch).observe(document,
+        {childList: true, subtree: true, attributes: true, characterData: true});
+    if (w.fetch) {
+        var fetch = w.fetch;
+        w.fetch = function () {
+            s.pending++;
+            try {
+                var p = fetch.apply(this, arguments);
+                p.then(done, done);
+                return p;
+            } catch (e) { done(); throw e; }
+        };
+    }
+    if (w.XMLHttpRequest) {
+        var send = w.XMLHttpRequest.prototype.send;
+        w.XMLHttpRequest.prototype.send = function () {
+            s.pending++;
+            this.addEventListener('loadend', done);
+            try { return send.apply(this, arguments); } catch (e) { done(); throw e; }
+        };
+    }
+}
+return [document.readyState, s.pending, Date.now() - s.last];
+"""
@@ -0,0 +1,135 @@
+import re
+import lxml.html
+from lxml import etree
+
+from typing import List
+
+from automatic.utils import Logger, LOGGER_AUTOMATIC
+
+logger = Logger.get(LOGGER_AUTOMATIC)
+
+# never rendered
+HIDDEN_TAGS = ["head", "script", "style", "template", "noscript"]
+HIDDEN_STYLE = re.compile(r"(display\s*:\s*none|visibility\s*:\s*(hidden|collapse)"
+                          r"|opacity\s*:\s*0*(\.0*)?\s*(;|!|$))", re.I)
+SPACES = re.compile(r"[ \t\r\f\v]+")
+# start on a new line in the rendered text
+BLOCK_TAGS = ["address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset",
+              "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+              "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table",
+              "tr", "ul", "option"]
+
+
+class Snapshot:
+    """
+    Parsed page_source of a window/frame, to answer read-only queries
+    without round trips.
+
+    Visibility is approximated from the markup(hidden attribute, inline
+    style, hidden inputs), since there are no computed styles.
+    """
+
+    def __init__(self, html: str):
+        self.__root = lxml.html.document_fromstring(html) if html and html.strip() \
+            else lxml.html.document_fromstring("<html></html>")
+
+    def find(self, by, path, *, filter=True) -> List[etree._Element]:
+        if by == "xpath":
+            found = self.__root.xpath(path)
+        elif by == "id":
+            found = self.__root.xpath("//*[@id=$value]", value=path)
+        elif by == "name":
+            found = self.__root.xpath("//*[@name=$value]", value=path)
+        else:
+            raise ValueError(f"Snapshot can't find by {by}")
+
+        found = [e for e in found if isinstance(e, etree._Element) and isinstance(e.tag, str)]
+        if not filter:
+            return found
+        return [e for e in found if displayed(e) and enabled(e)]
+
+
+def displayed(elem: etree._Element) -> bool:
+    if elem.tag == "input" and (elem.get("type") or "").lower() == "hidden":
+        return False
+    curr = elem
+    while curr is not None:
+        if curr.tag in HIDDEN_TAGS or not displayed_self(curr):
+            return False
+        curr = curr.getparent()
+    return True
+
+
+def enabled(elem: etree._Element) -> bool:
+    if elem.tag in ["button", "input", "select", "textarea", "option", "optgroup", "fieldset"]:
+        return elem.get("disabled") is None
+    return True
+
+
+def displayed_self(elem: etree._Element) -> bool:
+    return elem.get("hidden") is None and not HIDDEN_STYLE.search(elem.get("style") or "")
+
+
+def text(elem: etree._Element) -> str:
+    """
+    Rendered text of the element, like WebElement.text.
+    """
+    parts = []
+
+    def walk(e):
+        if not isinstance(e.tag, str) or e.tag in HIDDEN_TAGS or not displayed_self(e):
+            return
+        block = e.tag in BLOCK_TAGS
+        if block or e.tag == "br":
+            parts.append("\n")
+        if e.text:
+            parts.append(e.text.replace("\n", " "))
+        for child in e:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail.replace("\n", " "))
+        if block:
+            parts.append("\n")
+        elif e.tag in ["td", "th"]:
+            parts.append(" ")
+
+    walk(elem)
+    lines = [SPACES.sub(" ", line).strip() for line in "".join(parts).split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+class SnapshotStore:
+    """
+    Snapshots by the parent chain(window/frame) of descriptors.
+    """
+
+    def __init__(self):
+        self.__enabled = False
+        self.__snapshots = {}
+        self.__pulls = 0
+        self.__queries = 0
+
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    def enable(self, enabled=True):
+        self.__enabled = enabled
+        if not enabled:
+            self.invalidate()
+
+    def get(self, chain) -> Snapshot:
+        self.__queries += 1
+        return self.__snapshots.get(chain)
+
+    def put(self, chain, html) -> Snapshot:
+        self.__pulls += 1
+        snapshot = Snapshot(html)
+        self.__snapshots[chain] = snapshot
+        return snapshot
+
+    def invalidate(self):
+        self.__snapshots.clear()
+
+    def stats(self):
+        return {"pulls": self.__pulls, "queries": self.__queries,
+                "snapshots": len(self.__snapshots)}
@@ -1,4 +1,5 @@
 
+
 # WebDriver Manager (selenium 4)
 # https://pypi.org/project/webdriver-manager/#use-with-edge
 
@@ -6,6 +7,67 @@ from selenium import webdriver
 from selenium.webdriver.edge.service import Service
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
 
+import os
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from automatic.utils import Logger, LOGGER_AUTOMATIC
+
+logger = Logger.get(LOGGER_AUTOMATIC)
+
+DRIVER_CACHE = os.path.join(os.path.expanduser("~"), ".iaa", "driver.json")
+
+_lock = threading.Lock()
+_driver_path = None
+
+
+def _read_cache(cache):
+    try:
+        with open(cache, "r", encoding="utf-8") as f:
+            path = json.load(f).get("edge")
+        return path if path and os.path.exists(path) else None
+    except Exception:
+        return None
+
+
+def _write_cache(cache, path):
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        with open(cache, "w", encoding="utf-8") as f:
+            json.dump({"edge": path}, f)
+    except Exception as e:
+        logger.warning(f"Failed to cache the driver path. e={e}")
+
+
+def driver_path(*, refresh=False, cache=DRIVER_CACHE):
+    """
+    Path of the edge driver binary.
+
+    It is resolved once through webdriver manager(network) and cached in
+    the process and in the cache file, so later runs work offline.
+    Returns None when it can't be resolved, so selenium looks up the PATH.
+    """
+    global _driver_path
+    with _lock:
+        if not refresh:
+            if _driver_path and os.path.exists(_driver_path):
+                return _driver_path
+            _driver_path = _read_cache(cache)
+            if _driver_path:
+                return _driver_path
+
+        try:
+            path = EdgeChromiumDriverManager().install()
+            _write_cache(cache, path)
+            _driver_path = path
+        except Exception as e:
+            logger.warning(f"Failed to resolve the driver. e={e}")
+            _driver_path = _driver_path if _driver_path else _read_cache(cache)
+        return _driver_path
+
+
 def create_driver(headless=False):
     options = webdriver.EdgeOptions()
     # level 3 is lowest value for log-level
@@ -14,7 +76,70 @@ def create_driver(headless=False):
         options.add_argument('headless')
         options.add_argument('disable-gpu')
 
-    service = Service(EdgeChromiumDriverManager().install())
-    import time
-    time.sleep(1)
+    path = driver_path()
+    service = Service(path) if path else Service()
     return webdriver.Edge(options=options, service=service)
+
+
+class DriverFactory:
+    """
+    Hands out drivers, keeping a number of prewarmed ones ready.
+
+    prewarm: number of browsers started in background ahead of time
+    """
+
+    def __init__(self, *, headless=False, prewarm=0):
+        self.__headless = headless
+        self.__prewarm = prewarm
+        self.__ready = queue.Queue()
+        self.__closed = False
+        self.__executor = ThreadPoolExecutor(max_workers=prewarm) if prewarm else None
+        for _ in range(prewarm):
+            self.__warm()
+
+    def __start(self):
+        if self.__closed:
+            return
+        try:
+            driver = create_driver(headless=self.__headless)
+        except Exception as e:
+            logger.warning(f"Failed to prewarm a driver. e={e}")
+            return
+        if self.__closed:
+            driver.quit()
+        else:
+            self.__ready.put(driver)
+
+    def __warm(self):
+        self.__executor.submit(self.__start)
+
+    def ready(self) -> int:
+        return self.__ready.qsize()
+
+    def create(self):
+        try:
+            driver = self.__ready.get_nowait()
+        except queue.Empty:
+            # prewarming ones are still starting
+            return create_driver(headless=self.__headless)
+        self.__warm()
+        return driver
+
+    # so that it can be used as a factory of SessionPool
+    __call__ = create
+
+    def close(self):
+        self.__closed = True
+        if self.__executor:
+            self.__executor.shutdown(wait=True)
+        while not self.__ready.empty():
+            try:
+                self.__ready.get_nowait().quit()
+            except Exception as e:
+                logger.warning(f"Failed to quit a driver. e={e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,124 @@
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from typing import Union
+
+from automatic.utils import Logger, LOGGER_AUTOMATIC
+
+logger = Logger.get(LOGGER_AUTOMATIC)
+
+
+class WindowIndex:
+    """
+    handle -> (title, url) index of the open windows.
+
+    The index is rebuilt only when the set of window handles changes or it
+    is invalidated by a navigation op, so lookups don't switch tabs. On a
+    miss, only the windows which may have changed are read again: the ones
+    an op may have navigated, and the ones opened since the last rebuild,
+    which may still be loading. A full rescan is left to the caller, once
+    per lookup.
+    """
+
+    def __init__(self, driver: WebDriver, current=None, *, on_rebuild=None):
+        """
+        current: returns the handle to come back to after a rebuild.
+        on_rebuild: called after a rebuild or a recheck switched windows.
+        """
+        self.__driver = driver
+        self.__current = current if current else lambda: driver.current_window_handle
+        self.__on_rebuild = on_rebuild
+        self.__windows = {}
+        # handles whose entry is known to be current since the last change
+        self.__checked = set()
+        # handles opened since the last rebuild, or still loading
+        self.__fresh = set()
+        self.__dirty = True
+
+    def invalidate(self):
+        self.__dirty = True
+
+    def changed(self):
+        """
+        A page may have navigated(click, type...), entries are rechecked.
+        """
+        self.__checked.clear()
+
+    def windows(self):
+        return dict(self.__windows)
+
+    def __read(self, handles):
+        """
+        Reads the title/url of the windows, coming back to the current one.
+        The current window is read without a switch.
+        """
+        current = self.__current()
+        switched = False
+        for handle in handles:
+            try:
+                if handle != current:
+                    self.__driver.switch_to.window(handle)
+                    switched = True
+                self.__windows[handle] = (self.__driver.title, self.__driver.current_url)
+                self.__checked.add(handle)
+            except Exception as e:
+                logger.debug(f"Failed to index a window. handle={handle}, e={e}")
+                self.__windows.pop(handle, None)
+                self.__checked.discard(handle)
+
+        if switched:
+            self.__driver.switch_to.window(current)
+            if self.__on_rebuild:
+                self.__on_rebuild()
+
+    def __loading(self, handle) -> bool:
+        title, url = self.__windows.get(handle, ("", ""))
+        return not title or url in ["", "about:blank"]
+
+    def __rebuild(self, handles):
+        known = set(self.__windows)
+        self.__windows = {}
+        self.__checked = set()
+        self.__read(handles)
+        # the first build has nothing to compare with
+        self.__fresh = {h for h in self.__windows
+                        if (known and h not in known) or self.__loading(h)}
+        self.__dirty = False
+
+    def refresh(self, *, force=False):
+        handles = self.__driver.window_handles
+        if force or self.__dirty or set(handles) != set(self.__windows):
+            self.__rebuild(handles)
+
+    def __find(self, index: int, value: str) -> Union[str, None]:
+        for handle, entry in self.__windows.items():
+            if entry[index].find(value) >= 0:
+                return handle
+        return None
+
+    def find(self, by: str, value: str, *, rescan=False) -> Union[str, None]:
+        """
+        by: "title" or "url"
+        rescan: read every window again on a miss, e.g. on the first
+                attempt of a lookup, for pages which navigated by themselves
+        """
+        index = 0 if by == "title" else 1
+        self.refresh()
+        handle = self.__find(index, value)
+        if handle and handle not in self.__checked:
+            self.__read([handle])
+            if handle not in self.__windows or self.__windows[handle][index].find(value) < 0:
+                handle = None
+        if handle:
+            return handle
+
+        if rescan:
+            self.refresh(force=True)
+        else:
+            stale = [h for h in self.__windows if h not in self.__checked or h in self.__fresh]
+            if not stale:
+                return None
+            self.__read(stale)
+            # loaded windows aren't fresh anymore
+            self.__fresh = {h for h in self.__fresh
+                            if h in self.__windows and self.__loading(h)}
+        return self.__find(index, value)
@@ -1 +1,3 @@
 from .logger import Logger, LOGGER_AUTOMATIC
+from .metrics import Metrics, metrics
+from .capture import CaptureWriter, capture_writer, set_capture_writer
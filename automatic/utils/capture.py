@@ -0,0 +1,168 @@
+
+import os
+import re
+import gzip
+import queue
+import threading
+
+from .logger import Logger, LOGGER_AUTOMATIC
+
+logger = Logger.get(LOGGER_AUTOMATIC)
+
+LOG_DIR = os.path.join(os.path.expanduser("~"), ".iaa", "log")
+# <base>.<session>.<index>.<ext>[.gz], the files of capture writers
+CAPTURE_FILE = re.compile(r"^.+\.[^.]+\.\d+\.[A-Za-z0-9]+(\.gz)?$")
+
+
+class CaptureWriter:
+    """
+    Writes captures on a background thread.
+
+    Callers only enqueue the captured data. Each session keeps a ring buffer
+    of its last N captures, text files are gzip compressed, and the oldest
+    files are removed when the directory goes over the disk cap.
+
+    ring: captures kept per session and base filename
+    max_bytes: disk cap of the capture files in the directory, including
+               the ones of earlier runs and other writers
+    queue_size: pending captures. new ones are dropped when it's full.
+    """
+
+    def __init__(self, directory=LOG_DIR, *, ring=10, max_bytes=100 * 1024 * 1024,
+                 queue_size=32, compress=True):
+        self.__directory = directory
+        self.__ring = ring
+        self.__max_bytes = max_bytes
+        self.__compress = compress
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.__lock = threading.Lock()
+        # (session, base) -> number of captures
+        self.__counters = {}
+        self.__dropped = 0
+        # captures left over by earlier runs count too
+        self.__enforce_cap()
+        self.__thread = threading.Thread(target=self.__run, name="CaptureWriter", daemon=True)
+        self.__thread.start()
+
+    def __path(self, session, base, index, ext):
+        if ext in ["html", "txt"] and self.__compress:
+            ext = ext + ".gz"
+        return os.path.join(self.__directory, f"{base}.{session}.{index}.{ext}")
+
+    def submit(self, session, base_filename, files):
+        """
+        Enqueue a capture and return the paths it will be written to.
+
+        files: extension -> str, bytes or a callable returning them, which
+               is called on the writer thread(e.g. image encoding).
+        """
+        with self.__lock:
+            key = (session, base_filename)
+            count = self.__counters.get(key, 0)
+            self.__counters[key] = count + 1
+        index = count % self.__ring
+
+        items = [(self.__path(session, base_filename, index, ext), data)
+                 for ext, data in files.items()]
+        try:
+            self.__queue.put_nowait(items)
+        except queue.Full:
+            with self.__lock:
+                self.__dropped += 1
+                dropped = self.__dropped
+            logger.warning(f"Capture queue is full. dropped={dropped}")
+        return [path for path, _ in items]
+
+    def dropped(self) -> int:
+        with self.__lock:
+            return self.__dropped
+
+    def flush(self):
+        """
+        Block until the queued captures are written.
+        """
+        self.__queue.join()
+
+    def __run(self):
+        while True:
+            items = self.__queue.get()
+            try:
+                for path, data in items:
+                    self.__write(path, data)
+                self.__enforce_cap()
+            except Exception as e:
+                logger.error(f"Failed to write a capture. e={e}")
+            finally:
+                self.__queue.task_done()
+
+    def __write(self, path, data):
+        if callable(data):
+            data = data()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if data is None:
+            return
+
+        os.makedirs(self.__directory, exist_ok=True)
+        if path.endswith(".gz"):
+            with gzip.open(path, "wb") as f:
+                f.write(data)
+        else:
+            with open(path, "wb") as f:
+                f.write(data)
+        logger.debug(f"Capture saved to {path}")
+
+    def __captures(self):
+        """
+        [(mtime, size, path)] of the capture files in the directory, oldest
+        first, whoever wrote them.
+        """
+        files = []
+        try:
+            with os.scandir(self.__directory) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not CAPTURE_FILE.match(entry.name):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        except FileNotFoundError:
+            return []
+        files.sort()
+        return files
+
+    def __enforce_cap(self):
+        files = self.__captures()
+        total = sum(size for _, size, _ in files)
+        # the newest one is kept whatever its size
+        for _, size, path in files[:-1]:
+            if total <= self.__max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.debug(f"Failed to remove a capture. path={path}, e={e}")
+            total -= size
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def capture_writer() -> CaptureWriter:
+    """
+    CaptureWriter shared by the contexts.
+    """
+    global _writer
+    with _writer_lock:
+        if not _writer:
+            _writer = CaptureWriter()
+        return _writer
+
+
+def set_capture_writer(writer: CaptureWriter):
+    global _writer
+    with _writer_lock:
+        _writer = writer
@@ -0,0 +1,210 @@
+
+import json
+import time
+import bisect
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# observations queued by a histogram before they are folded into its buckets
+PENDING_LIMIT = 1024
+
+
+class Histogram:
+    """
+    Latency histogram. Observations are queued without a lock and folded
+    into the buckets on read, or once PENDING_LIMIT of them are queued.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.__lock = threading.Lock()
+        # deque.append/popleft are atomic, so observers don't lock
+        self.__pending = deque()
+        # per bucket, the last one is for values above all buckets
+        self.__counts = [0] * (len(self.buckets) + 1)
+        self.__count = 0
+        self.__sum = 0.0
+
+    def observe(self, value):
+        self.__pending.append(value)
+        if len(self.__pending) >= PENDING_LIMIT:
+            self.__fold()
+
+    def __fold(self):
+        with self.__lock:
+            pending = self.__pending
+            # only what's queued now, observers may append meanwhile
+            values = [pending.popleft() for _ in range(len(pending))]
+            counts = self.__counts
+            for value in values:
+                counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.__count += len(values)
+            self.__sum += sum(values)
+
+    @property
+    def count(self):
+        self.__fold()
+        return self.__count
+
+    @property
+    def sum(self):
+        self.__fold()
+        return self.__sum
+
+    @property
+    def counts(self):
+        """
+        Cumulative counts of the buckets, as in Prometheus.
+        """
+        self.__fold()
+        counts = []
+        total = 0
+        for count in self.__counts[:-1]:
+            total += count
+            counts.append(total)
+        return counts
+
+    def reset(self):
+        with self.__lock:
+            self.__pending.clear()
+            self.__counts = [0] * (len(self.buckets) + 1)
+            self.__count = 0
+            self.__sum = 0.0
+
+    def to_dict(self):
+        return {
+            "buckets": {str(b): c for b, c in zip(self.buckets, self.counts)},
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(key, extra=None):
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Metrics:
+    """
+    Registry of counters and latency histograms, keyed by name and labels.
+    Exported as JSON or Prometheus text format.
+
+    enabled: record anything at all
+    latency: record histograms(op/phase/poll seconds). Off by default,
+             since timing every op costs about as much as dispatching it.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, *, latency=False):
+        self.enabled = True
+        self.latency = latency
+        self.__buckets = buckets
+        self.__lock = threading.Lock()
+        self.__counters = {}
+        self.__histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = _key(labels)
+        with self.__lock:
+            series = self.__counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        if not self.enabled or not self.latency:
+            return
+        self.series(name, **labels).observe(value)
+
+    def series(self, name, **labels) -> Histogram:
+        """
+        The histogram of the name and labels, created if needed. Hot paths
+        keep it and observe on it directly, without the registry lock or
+        building the label key. It stays registered across reset().
+        """
+        key = _key(labels)
+        with self.__lock:
+            series = self.__histograms.setdefault(name, {})
+            hist = series.get(key)
+            if not hist:
+                hist = series[key] = Histogram(self.__buckets)
+            return hist
+
+    @contextmanager
+    def timer(self, name, **labels):
+        if not self.enabled or not self.latency:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter(self, name, **labels):
+        with self.__lock:
+            return self.__counters.get(name, {}).get(_key(labels), 0)
+
+    def histogram(self, name, **labels):
+        with self.__lock:
+            return self.__histograms.get(name, {}).get(_key(labels))
+
+    def reset(self):
+        with self.__lock:
+            self.__counters.clear()
+            # emptied in place, since callers may hold them(see series)
+            for series in self.__histograms.values():
+                for hist in series.values():
+                    hist.reset()
+
+    def to_dict(self):
+        with self.__lock:
+            counters = {name: [{"labels": {k: str(v) for k, v in key}, "value": value}
+                               for key, value in series.items()]
+                        for name, series in self.__counters.items()}
+            histograms = {name: [dict(labels={k: str(v) for k, v in key}, **hist.to_dict())
+                                 for key, hist in series.items() if hist.count]
+                          for name, series in self.__histograms.items()}
+        # series kept by callers(see series) but emptied by reset()
+        histograms = {name: series for name, series in histograms.items() if series}
+        return {"counters": counters, "histograms": histograms}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self):
+        lines = []
+        with self.__lock:
+            for name, series in sorted(self.__counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_labels(key)} {value}")
+
+            for name, series in sorted(self.__histograms.items()):
+                series = {key: hist for key, hist in series.items() if hist.count}
+                if not series:
+                    continue
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in series.items():
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{name}_bucket{_labels(key, ('le', str(bound)))} {count}")
+                    lines.append(f"{name}_bucket{_labels(key, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_labels(key)} {hist.sum}")
+                    lines.append(f"{name}_count{_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+# registry shared by Automatic and the contexts
+metrics = Metrics()
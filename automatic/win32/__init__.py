@@ -1,3 +1,6 @@
 
 from .context import Context
-from .elements import *
\ No newline at end of file
+from .elements import *
+from .vision import Matcher, Match, TemplateCache, ChangeGate, Frame
+from .ocr import OcrCache, WordIndex, TiledOcr
+from .input import InputBackend, KeystrokeBackend, ClipboardBackend, RecordingBackend, AutoBackend
@@ -1,36 +1,61 @@
-# pyautogui
-import pyautogui
-import pyperclip
-import autoit
-import pytesseract
-from PIL import ImageGrab
-import cv2
-import numpy as np
-import os
+import io
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from automatic.common import Descriptor
 import automatic.common as common
+from automatic.common.polling import Strategy
 from automatic.common.exceptions import *
 from automatic.win32.elements import Image, is_window, Control, Title, Text
+from automatic.win32.vision import Matcher, Match, Frame, ChangeGate, capture, union
+from automatic.win32.ocr import OcrCache, WordIndex, ensure_tesseract
+from automatic.win32.input import InputBackend, AutoBackend
 
-from typing import Union
-from pyscreeze import Point
+from typing import List, Tuple, Union
+from collections import namedtuple
+
+# autoit and pyautogui are imported on first use
+from automatic.win32.lazy import autoit, pyautogui
+try:
+    from pyscreeze import Point
+except ImportError:
+    # same fields as pyscreeze.Point, where pyautogui isn't installed
+    Point = namedtuple("Point", "x y")
 
 from automatic.utils import Logger, LOGGER_AUTOMATIC
+from automatic.utils.metrics import metrics
+from automatic.utils.capture import capture_writer
 
 logger = Logger.get(LOGGER_AUTOMATIC)
 
-pyautogui.FAILSAFE = False
-
 def get_or(a, b) -> int:
     return a if a else b
 
 class Context(common.Context):
-    def __init__(self,* ,timeout=60, differ=0, confidence=.9, grayscale=True):
+    def __init__(self,* ,timeout=60, differ=0, confidence=.9, grayscale=True, strategy: Strategy = None,
+                 screenshot=None, change_tolerance=0, workers=None, ocr=None,
+                 input_backend: InputBackend = None):
+        """
+        screenshot: image file of the screen used instead of the live screen
+        change_tolerance: difference(0-255) of a captured region still
+                          considered unchanged, to skip image/text searches
+        workers: threads of parallel template matching
+        ocr: OCR engine of Text lookups, e.g. TiledOcr(size=1024, workers=4).
+             a single tesseract run over the window if not given.
+        input_backend: how type() enters text. AutoBackend if not given.
+        """
+        super().__init__(timeout=timeout, differ=differ, strategy=strategy)
         self.__timeout = timeout 
-        self.__differ = differ
         self.__confidence = confidence
         self.__grayscale = grayscale
+        self.__screenshot = screenshot
+        self.__matcher = Matcher()
+        self.__gate = ChangeGate(tolerance=change_tolerance)
+        self.__ocr = OcrCache(engine=ocr)
+        self.__workers = workers
+        self.__executor = None
+        self.__input = input_backend if input_backend else AutoBackend()
 
 # ---------------------
 # ----- Activate ------
@@ -39,15 +64,23 @@ class Context(common.Context):
     def __activate_window(self, window, timeout):
         """
         Using Autoit APIs, wait until a window activated.
+        timeout: None checks the window once without waiting
         """
         try:
-            autoit.win_wait(window, timeout=timeout)
+            if timeout is None:
+                if not autoit.win_exists(window):
+                    return False
+            else:
+                autoit.win_wait(window, timeout=timeout)
         except Exception as e:
             print(f"ERROR: Failed to find a window. window={window}, e={e}")
             return False
 
         try:
-            autoit.win_activate(window, timeout=timeout)
+            if timeout is None:
+                autoit.win_activate(window)
+            else:
+                autoit.win_activate(window, timeout=timeout)
         except Exception as e:
             print(
                 f"ERROR: Failed to activate a window. window={window}, e={e}")
@@ -58,30 +91,199 @@ class Context(common.Context):
     def __activate(self, desc: Descriptor):
         if not desc:
             raise Exception("Descriptor should not be none")
-        
+
+        with metrics.timer("automatic_phase_seconds", context=self.kind(), phase="activate"):
+            self.__activate_chain(desc)
+
+    def __activate_chain(self, desc: Descriptor):
         # activate a parent
         parent = desc.parent()
         if parent:
-            self.__activate(parent)
+            self.__activate_chain(parent)
 
         elem = self.get(desc)
         if not elem:
             raise ElementNotFoundException(self, desc, "activate")
 
         if is_window(desc):
-            timeout = get_or(desc.timeout(), self.__timeout)
+            # autoit waits by itself, within what's left of the operation.
+            # it takes whole seconds, and 0 means forever, so a probe or a
+            # spent deadline checks once instead.
+            budget = self.budget(get_or(desc.timeout(), self.__timeout))
+            timeout = None if self.probing() or not budget else math.ceil(budget)
             self.__activate_window(elem, timeout)
 
 
-    def get_position(self, desc:Image) -> Union[Point, None]:
+    def __region(self, desc: Image):
         """
-        Get a center position of the image
+        Region to search for the image, (left, top, right, bottom).
+        """
+        if desc.region():
+            return desc.region()
+        parent = desc.parent()
+        if isinstance(parent, Title):
+            try:
+                return autoit.win_get_pos(parent.path())
+            except Exception as e:
+                logger.debug(f"Failed to get a window position. window={parent.path()}, e={e}")
+        return None
+
+    def match(self, desc:Image) -> Union[Match, None]:
+        """
+        Match of the image with its score
         """
         timeout = get_or(desc.timeout(), self.__timeout)
-        grayscale = desc.grayscale() if desc.grayscale() else self.__grayscale
+
+        def _match():
+            region = self.__region(desc)
+            return self.__match_in(desc, region, capture(region, screenshot=self.__screenshot))
+
+        return self.poll(_match, timeout=timeout)
+
+    def __match_in(self, desc: Image, region, frame: Frame) -> Union[Match, None]:
+        grayscale = desc.grayscale() if desc.grayscale() is not None else self.__grayscale
         confidence = desc.confidence() if desc.confidence() else self.__confidence
-        return common.wait(lambda: pyautogui.locateCenterOnScreen(
-           desc.path(), grayscale=grayscale, confidence=confidence), timeout=timeout)
+        key = ("image", desc.path(), region, grayscale, confidence)
+        return self.__search(key, frame.crop(region), lambda f: self.__matcher.match(
+            f, desc.path(), grayscale=grayscale, confidence=confidence))
+
+    def __match_all(self, descs: List[Image], parallel) -> List[Tuple[Image, Match]]:
+        """
+        Matches of the images on one capture of the union of their regions.
+        """
+        regions = [self.__region(desc) for desc in descs]
+        frame = capture(union(regions), screenshot=self.__screenshot)
+        if any(self.__grayscale if d.grayscale() is None else d.grayscale() for d in descs):
+            # convert once, the crops share it
+            frame.gray()
+        if parallel and len(descs) > 1:
+            results = list(self.__pool().map(
+                lambda pair: self.__match_in(pair[0], pair[1], frame), zip(descs, regions)))
+        else:
+            results = [self.__match_in(desc, region, frame) for desc, region in zip(descs, regions)]
+        return [(desc, match) for desc, match in zip(descs, results) if match]
+
+    def __pool(self) -> ThreadPoolExecutor:
+        # matchTemplate releases the GIL, so threads run the searches in parallel
+        if not self.__executor:
+            self.__executor = ThreadPoolExecutor(max_workers=self.__workers,
+                                                 thread_name_prefix="Matcher")
+        return self.__executor
+
+    def locate_many(self, descs: List[Image], *, timeout=None, parallel=False) -> List[Tuple[Image, Match]]:
+        """
+        All images found on one screen capture, [(descriptor, match)].
+        Waits until at least one of them is found.
+
+        parallel: match the templates in a thread pool
+        """
+        timeout = timeout if timeout is not None else self.__timeout
+        hits = self.poll(lambda: self.__match_all(descs, parallel) or None, timeout=timeout)
+        return hits if hits else []
+
+    def first_of(self, descs: List[Descriptor], *, timeout=None, parallel=False) -> Union[Tuple[Descriptor, object], None]:
+        """
+        The first of the descriptors(in the given order) found, polled in
+        one loop. Images are matched on one screen capture per attempt.
+
+        returns: (descriptor, Match/Point/window/Control) or None
+        """
+        if not descs:
+            return None
+        timeout = timeout if timeout is not None else max(self.timeout(d) or 0 for d in descs)
+        return self.poll(lambda: self.__first_once(descs, parallel), timeout=timeout)
+
+    def __first_once(self, descs: List[Descriptor], parallel):
+        images = [d for d in descs if isinstance(d, Image)]
+        matches = dict(self.__match_all(images, parallel)) if images else {}
+        for desc in descs:
+            if isinstance(desc, Image):
+                if desc in matches:
+                    return (desc, matches[desc])
+                continue
+            with self.operation(desc, probe=True):
+                handle = self.__probe(desc)
+            if handle:
+                return (desc, handle)
+        return None
+
+    def __probe(self, desc: Descriptor):
+        try:
+            if isinstance(desc, Title):
+                return desc.path() if autoit.win_exists(desc.path()) else None
+            if isinstance(desc, Control):
+                parent = desc.parent()
+                autoit.control_get_text(parent.path(), desc.path())
+                return desc
+            return self.get(desc)
+        except Exception as e:
+            logger.debug(f"Failed to probe a candidate. desc={desc}, e={e}")
+            return None
+
+    def __search(self, key, frame: Frame, func):
+        """
+        Run a vision search unless the frame didn't change since it failed.
+        """
+        signature = self.__gate.check(key, frame)
+        metrics.inc("automatic_vision_searches_total", context=self.kind(), search=key[0],
+                    result="skipped" if signature is None else "executed")
+        if signature is None:
+            return None
+        result = func(frame)
+        self.__gate.record(key, signature, result is not None)
+        return result
+
+    def _settled(self, desc: Descriptor, settle, state: dict) -> bool:
+        """
+        The pixels of the descriptor's region didn't change for settle.quiet.
+        """
+        try:
+            frame = capture(self.__settle_region(desc), screenshot=self.__screenshot)
+        except Exception as e:
+            logger.debug(f"Failed to capture for settle. e={e}")
+            return False
+        now = time.monotonic()
+        signature = (frame.image.shape, frame.digest())
+        if state.get("signature") != signature:
+            state["signature"] = signature
+            state["since"] = now
+        return now - state["since"] >= settle.quiet
+
+    def __settle_region(self, desc: Descriptor):
+        """
+        Region of an image, or the window the descriptor is in.
+        """
+        if isinstance(desc, Image):
+            return self.__region(desc)
+        curr = desc
+        while curr:
+            if isinstance(curr, Title):
+                try:
+                    return autoit.win_get_pos(curr.path())
+                except Exception as e:
+                    logger.debug(f"Failed to get a window position. window={curr.path()}, e={e}")
+                    return None
+            curr = curr.parent()
+        return None
+
+    def ocr_stats(self):
+        """
+        Hits and misses of the OCR cache.
+        """
+        return self.__ocr.stats()
+
+    def gate_stats(self):
+        """
+        Number of skipped and executed vision searches.
+        """
+        return self.__gate.stats()
+
+    def get_position(self, desc:Image) -> Union[Point, None]:
+        """
+        Get a center position of the image
+        """
+        match = self.match(desc)
+        return Point(match.x, match.y) if match else None
 
     def get_position_from_text(self, desc:Text) -> Union[Point, None]:
         """
@@ -95,48 +297,30 @@ class Context(common.Context):
             raise Exception("Parent should be Title object")
 
         # To make sure that tesseract installed. Otherwise, it raise exception.
-        found = False
-        try:
-            _ = pytesseract.get_tesseract_version()
-            found = True
-        except:
-            pass
+        ensure_tesseract()
 
-        if not found:
-            try:
-                pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-                _ = pytesseract.get_tesseract_version()
-                found = True
-            except:
-                pass
-        
-        if not found:
-            raise Exception("tesseract is not found in your path. Please check your environment.")
+        def _locate(index: WordIndex, text):
+            pos = index.locate(text, ignore_case=desc.ignore_case(), fuzzy=desc.fuzzy())
+            return Point(*pos) if pos else None
 
         def _get_position(title, text):
             # 1. windows coordinate
             bbox = autoit.win_get_pos(title)
-            # 2. capture
-            screenshot = ImageGrab.grab(bbox=bbox) # (left, top, right, bottom)
-            # 3. preprocessing
-            # OpenCV는 BGR 색상 체계를 사용하므로 RGB로 변환
-            image_np = np.array(screenshot)
-            image_np = cv2.cvtColor(image_np, cv2.COLOR_BGR2RGB)
-            gray_image = cv2.cvtColor(image_np, cv2.COLOR_RGB2GRAY)
-            # 4. ocr
-            config='-l kor+eng'
-            data = pytesseract.image_to_data(gray_image, config=config, output_type=pytesseract.Output.DICT)
-            # 5. get position
-            for i, word in enumerate(data['text']):
-                if word == text:
-                    x = data['left'][i] + data['width'][i] / 2
-                    y = data['top'][i] + data['height'][i] / 2
-                    return Point(bbox[0] + x, bbox[1] + y)
-            return None
+            # 2. capture (left, top, right, bottom)
+            frame = capture(bbox, screenshot=self.__screenshot)
+            # 3. skip when nothing changed since the last miss. Lookups on
+            # the same window share the OCR pass of the frame.
+            key = ("text", title, text, desc.ignore_case(), desc.fuzzy())
+            return self.__search(key, frame,
+                                 lambda f: _locate(self.__ocr.index(title, f), text))
 
-        return common.wait(lambda: _get_position(parent.path(), desc.path()), timeout=timeout)
+        return self.poll(lambda: _get_position(parent.path(), desc.path()), timeout=timeout)
 
     def get(self, desc:Descriptor):
+        with metrics.timer("automatic_phase_seconds", context=self.kind(), phase="lookup"):
+            return self.__get(desc)
+
+    def __get(self, desc:Descriptor):
         if isinstance(desc, Image):
             return self.get_position(desc)
 
@@ -204,26 +388,22 @@ class Context(common.Context):
     def type(self, desc: Descriptor, text):
         self.click(desc)
         logger.debug("Typing: " + text)
-        pyautogui.typewrite(text)
+        self.__input.type(text)
 
     def capture(self, base_filename="capture"):
         """
         Captures the current screen and saves it as an image.
-        Files are saved in the ~/.iaa/log/ directory.
+        Files are written to the ~/.iaa/log/ directory in background.
         """
-        # Ensure the log directory exists
-        log_dir = os.path.join(os.path.expanduser("~"), ".iaa", "log")
-        os.makedirs(log_dir, exist_ok=True)
-
-        # Define file path
-        screenshot_filepath = os.path.join(log_dir, f"{base_filename}.png")
-
-        # Capture screenshot
         try:
             screenshot = pyautogui.screenshot()
-            screenshot.save(screenshot_filepath)
-            logger.info(f"Screenshot saved to {screenshot_filepath}")
         except Exception as e:
             logger.error(f"Failed to capture screenshot: {e}")
+            return []
+
+        def encode():
+            buffer = io.BytesIO()
+            screenshot.save(buffer, format="PNG")
+            return buffer.getvalue()
 
-        return [screenshot_filepath]
+        return capture_writer().submit("win32", base_filename, {"png": encode})
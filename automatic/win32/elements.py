@@ -6,9 +6,14 @@ from typing import Union
 # Element Descriptor
 class Image(Descriptor):
     def __init__(self, desc, path, *, parent: 'Union[None, Descriptor]' =None,
-                 timeout=None,differ=None, confidence=None, grayscale=None):
+                 timeout=None,differ=None, confidence=None, grayscale=None, region=None):
+        """
+        region: (left, top, right, bottom) of the screen to search. The
+                window of a Title parent is searched if not given.
+        """
         self.__confidence = confidence
         self.__grayscale = grayscale
+        self.__region = region
         super().__init__(desc, path, parent=parent, timeout=timeout, differ=differ)
 
 
@@ -21,6 +26,9 @@ class Image(Descriptor):
     def confidence(self):
         return self.__confidence
 
+    def region(self):
+        return self.__region
+
 class Control(Descriptor):
     def by(self) -> str:
         return "control"
@@ -31,9 +39,25 @@ class Title(Descriptor):
         return "title"
 
 class Text(Descriptor):
+    def __init__(self, desc, path, *, parent: 'Union[None, Descriptor]' =None,
+                 timeout=None, differ=0, ignore_case=False, fuzzy=0):
+        """
+        path: a word or a phrase of words in a line
+        fuzzy: minimum similarity(0-1) of each word. 0 means exact.
+        """
+        self.__ignore_case = ignore_case
+        self.__fuzzy = fuzzy
+        super().__init__(desc, path, parent=parent, timeout=timeout, differ=differ)
+
     def by(self) -> str:
         return "text"
 
+    def ignore_case(self):
+        return self.__ignore_case
+
+    def fuzzy(self):
+        return self.__fuzzy
+
 
 def is_window(desc:Descriptor):
     return True if desc.by() in ["title"] else False
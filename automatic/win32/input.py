@@ -0,0 +1,105 @@
+
+import time
+from abc import ABC, abstractmethod
+
+from automatic.win32.lazy import pyautogui, pyperclip
+from automatic.utils import Logger, LOGGER_AUTOMATIC
+
+logger = Logger.get(LOGGER_AUTOMATIC)
+
+
+class InputBackend(ABC):
+    """
+    Enters text into the focused control.
+    """
+
+    @abstractmethod
+    def type(self, text):
+        pass
+
+
+class KeystrokeBackend(InputBackend):
+    """
+    One keystroke per character. Only keys known to pyautogui can be typed.
+
+    interval: seconds between keystrokes
+    """
+
+    def __init__(self, *, interval=0.0):
+        self.__interval = interval
+
+    def type(self, text):
+        pyautogui.typewrite(text, interval=self.__interval)
+
+
+class ClipboardBackend(InputBackend):
+    """
+    Pastes the text with ctrl+v, in constant time whatever its length or
+    character set.
+
+    restore: put the previous clipboard back after pasting
+    restore_delay: seconds to give the application to read the clipboard
+    """
+
+    def __init__(self, *, restore=True, restore_delay=0.1):
+        self.__restore = restore
+        self.__restore_delay = restore_delay
+
+    def type(self, text):
+        previous = None
+        if self.__restore:
+            try:
+                previous = pyperclip.paste()
+            except Exception as e:
+                logger.debug(f"Failed to read the clipboard. e={e}")
+
+        pyperclip.copy(text)
+        pyautogui.hotkey("ctrl", "v")
+
+        if previous is not None:
+            time.sleep(self.__restore_delay)
+            pyperclip.copy(previous)
+
+
+class RecordingBackend(InputBackend):
+    """
+    Keeps the typed texts in memory instead of sending them, for tests.
+    """
+
+    def __init__(self):
+        self.typed = []
+
+    def type(self, text):
+        self.typed.append(text)
+
+
+def typable(text) -> bool:
+    """
+    Every character has a key pyautogui can press.
+    """
+    return all(c in pyautogui.KEYBOARD_KEYS for c in text)
+
+
+class AutoBackend(InputBackend):
+    """
+    Short texts of typable characters are typed key by key, the others are
+    pasted from the clipboard.
+
+    max_keystrokes: longest text typed key by key
+    """
+
+    def __init__(self, *, max_keystrokes=32, keystroke: InputBackend = None,
+                 clipboard: InputBackend = None):
+        self.__max_keystrokes = max_keystrokes
+        self.__keystroke = keystroke if keystroke else KeystrokeBackend()
+        self.__clipboard = clipboard if clipboard else ClipboardBackend()
+
+    def choose(self, text) -> InputBackend:
+        if len(text) <= self.__max_keystrokes and typable(text):
+            return self.__keystroke
+        return self.__clipboard
+
+    def type(self, text):
+        backend = self.choose(text)
+        logger.debug(f"Typing {len(text)} characters with {backend.__class__.__name__}")
+        backend.type(text)
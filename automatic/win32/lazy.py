@@ -0,0 +1,41 @@
+
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    Module imported on the first attribute access. Desktop automation
+    modules(autoit, pyautogui) are loaded only when the screen is used, so
+    matching and OCR on screenshot files work where they can't be imported.
+
+    on_import: called with the module once it's imported
+    """
+
+    def __init__(self, name, *, on_import=None):
+        self.__name = name
+        self.__on_import = on_import
+        self.__module = None
+        self.__lock = threading.Lock()
+
+    def __load(self):
+        if self.__module is None:
+            with self.__lock:
+                if self.__module is None:
+                    module = importlib.import_module(self.__name)
+                    if self.__on_import:
+                        self.__on_import(module)
+                    self.__module = module
+        return self.__module
+
+    def __getattr__(self, attr):
+        return getattr(self.__load(), attr)
+
+
+def _no_failsafe(module):
+    module.FAILSAFE = False
+
+
+autoit = LazyModule("autoit")
+pyautogui = LazyModule("pyautogui", on_import=_no_failsafe)
+pyperclip = LazyModule("pyperclip")
@@ -0,0 +1,348 @@
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from difflib import SequenceMatcher
+from typing import List, Union
+
+import numpy as np
+
+import pytesseract
+
+from automatic.win32.vision import Frame
+from automatic.utils import Logger, LOGGER_AUTOMATIC
+
+logger = Logger.get(LOGGER_AUTOMATIC)
+
+TESSERACT_WINDOWS = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+OCR_CONFIG = '-l kor+eng'
+
+_checked = None
+_check_lock = threading.Lock()
+
+
+def ensure_tesseract():
+    """
+    Make sure that tesseract is installed, once per process.
+    Otherwise, it raises an exception.
+    """
+    global _checked
+    with _check_lock:
+        if _checked is None:
+            _checked = _find_tesseract()
+    if not _checked:
+        raise Exception("tesseract is not found in your path. Please check your environment.")
+
+
+def _find_tesseract() -> bool:
+    try:
+        _ = pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        pass
+
+    try:
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_WINDOWS
+        _ = pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+class Word:
+    def __init__(self, text, left, top, width, height, line):
+        self.text = text
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        # (block, paragraph, line) the word belongs to
+        self.line = line
+
+
+class WordIndex:
+    """
+    Words of one OCR pass in screen coordinates, indexed by text.
+    """
+
+    def __init__(self, data: dict, left=0, top=0):
+        """
+        data: output of pytesseract.image_to_data(output_type=Output.DICT)
+        left, top: screen position of the OCR image
+        """
+        self.__words = []
+        for i, text in enumerate(data['text']):
+            text = text.strip() if text else ""
+            if not text:
+                continue
+            line = (data['block_num'][i], data['par_num'][i], data['line_num'][i]) \
+                if 'line_num' in data else (0, 0, 0)
+            self.__words.append(Word(text, left + data['left'][i], top + data['top'][i],
+                                     data['width'][i], data['height'][i], line))
+
+        # text -> positions in words, for exact lookups
+        self.__exact = {}
+        self.__lower = {}
+        for i, word in enumerate(self.__words):
+            self.__exact.setdefault(word.text, []).append(i)
+            self.__lower.setdefault(word.text.lower(), []).append(i)
+
+    def words(self) -> List[Word]:
+        return list(self.__words)
+
+    def __candidates(self, token, ignore_case, fuzzy):
+        if fuzzy:
+            return [i for i, word in enumerate(self.__words)
+                    if self.__similar(word.text, token, ignore_case, fuzzy)]
+        if ignore_case:
+            return self.__lower.get(token.lower(), [])
+        return self.__exact.get(token, [])
+
+    def __similar(self, a, b, ignore_case, fuzzy) -> bool:
+        if ignore_case:
+            a, b = a.lower(), b.lower()
+        return SequenceMatcher(None, a, b).ratio() >= fuzzy
+
+    def find(self, phrase, *, ignore_case=False, fuzzy=0) -> List[tuple]:
+        """
+        Boxes (left, top, right, bottom) of the phrase in reading order.
+        Words of a multi-word phrase should be consecutive in a line.
+
+        fuzzy: minimum similarity ratio(0-1) of each word. 0 means exact.
+        """
+        tokens = phrase.split()
+        if not tokens:
+            return []
+
+        boxes = []
+        for start in self.__candidates(tokens[0], ignore_case, fuzzy):
+            end = start + len(tokens)
+            if end > len(self.__words):
+                continue
+            words = self.__words[start:end]
+            if any(w.line != words[0].line for w in words):
+                continue
+            if not all(self.__matches(w.text, t, ignore_case, fuzzy)
+                       for w, t in zip(words[1:], tokens[1:])):
+                continue
+            boxes.append((min(w.left for w in words), min(w.top for w in words),
+                          max(w.left + w.width for w in words),
+                          max(w.top + w.height for w in words)))
+        return boxes
+
+    def __matches(self, text, token, ignore_case, fuzzy) -> bool:
+        if fuzzy:
+            return self.__similar(text, token, ignore_case, fuzzy)
+        if ignore_case:
+            return text.lower() == token.lower()
+        return text == token
+
+    def locate(self, phrase, **kwargs) -> Union[tuple, None]:
+        """
+        Center (x, y) of the first match of the phrase.
+        """
+        boxes = self.find(phrase, **kwargs)
+        if not boxes:
+            return None
+        left, top, right, bottom = boxes[0]
+        return ((left + right) / 2, (top + bottom) / 2)
+
+
+def ocr(frame: Frame, *, config=OCR_CONFIG) -> WordIndex:
+    ensure_tesseract()
+    data = pytesseract.image_to_data(frame.gray(), config=config,
+                                     output_type=pytesseract.Output.DICT)
+    return WordIndex(data, frame.left, frame.top)
+
+
+def tiles(width, height, *, size=1024, overlap=64):
+    """
+    Overlapping tiles (left, top, right, bottom) covering the image.
+    """
+    step = max(1, size - overlap)
+
+    def starts(length):
+        start, result = 0, [0]
+        while start + size < length:
+            start += step
+            result.append(start)
+        return result
+
+    return [(x, y, min(x + size, width), min(y + size, height))
+            for y in starts(height) for x in starts(width)]
+
+
+def _ocr_tile(image: np.ndarray, config, box):
+    """
+    Words of a tile, [(text, left, top, width, height)] in image coordinates.
+    Runs in a worker process.
+    """
+    ensure_tesseract()
+    left, top, right, bottom = box
+    data = pytesseract.image_to_data(image, config=config,
+                                     output_type=pytesseract.Output.DICT)
+    words = []
+    for i, text in enumerate(data['text']):
+        text = text.strip() if text else ""
+        if text:
+            words.append((text, left + data['left'][i], top + data['top'][i],
+                          data['width'][i], data['height'][i]))
+    return words
+
+
+def _owns(box, core):
+    """
+    A word belongs to the tile whose core contains the center of the word,
+    so words in the overlap of two tiles are kept once.
+    """
+    _, left, top, width, height = box
+    x, y = left + width / 2, top + height / 2
+    return core[0] <= x < core[2] and core[1] <= y < core[3]
+
+
+def _core(box, width, height, overlap):
+    left, top, right, bottom = box
+    half = overlap / 2
+    return (left + half if left > 0 else 0, top + half if top > 0 else 0,
+            right - half if right < width else width, bottom - half if bottom < height else height)
+
+
+def _merge(words) -> dict:
+    """
+    Words of all tiles as image_to_data output, grouped into lines by their
+    vertical position, in reading order.
+    """
+    words = sorted(words, key=lambda w: (w[2] + w[4] / 2, w[1]))
+    lines = []
+    for word in words:
+        center = word[2] + word[4] / 2
+        if lines:
+            last = lines[-1]
+            height = sum(w[4] for w in last) / len(last)
+            middle = sum(w[2] + w[4] / 2 for w in last) / len(last)
+            if abs(center - middle) <= height / 2:
+                last.append(word)
+                continue
+        lines.append([word])
+
+    data = {k: [] for k in ['text', 'left', 'top', 'width', 'height',
+                            'block_num', 'par_num', 'line_num']}
+    for number, line in enumerate(lines):
+        for text, left, top, width, height in sorted(line, key=lambda w: w[1]):
+            data['text'].append(text)
+            data['left'].append(left)
+            data['top'].append(top)
+            data['width'].append(width)
+            data['height'].append(height)
+            data['block_num'].append(1)
+            data['par_num'].append(1)
+            data['line_num'].append(number)
+    return data
+
+
+class TiledOcr:
+    """
+    OCR of a large capture in overlapping tiles on a pool of workers.
+    Word boxes are merged back into screen coordinates, and words in the
+    overlap of two tiles are kept once.
+
+    size: width and height of a tile in pixels
+    overlap: pixels shared by neighbouring tiles. should be wider than a word.
+    workers: number of workers. cpu count if not given.
+    mode: "process" or "thread". tesseract runs as a subprocess either way,
+          "thread" saves starting the pool on short runs.
+    """
+
+    def __init__(self, *, size=1024, overlap=64, workers=None, mode="process", config=OCR_CONFIG):
+        if mode not in ["process", "thread"]:
+            raise ValueError(f"mode should be process or thread. mode={mode}")
+        self.__size = size
+        self.__overlap = overlap
+        self.__workers = workers
+        self.__mode = mode
+        self.__config = config
+        self.__lock = threading.Lock()
+        self.__executor = None
+
+    def __pool(self):
+        with self.__lock:
+            if not self.__executor:
+                if self.__mode == "process":
+                    self.__executor = ProcessPoolExecutor(max_workers=self.__workers)
+                else:
+                    self.__executor = ThreadPoolExecutor(max_workers=self.__workers,
+                                                         thread_name_prefix="TiledOcr")
+            return self.__executor
+
+    def __call__(self, frame: Frame) -> WordIndex:
+        gray = frame.gray()
+        height, width = gray.shape[:2]
+        boxes = tiles(width, height, size=self.__size, overlap=self.__overlap)
+        if len(boxes) == 1:
+            return ocr(frame, config=self.__config)
+
+        futures = [self.__pool().submit(_ocr_tile, np.ascontiguousarray(gray[t:b, l:r]),
+                                        self.__config, (l, t, r, b))
+                   for l, t, r, b in boxes]
+        words = []
+        for box, future in zip(boxes, futures):
+            core = _core(box, width, height, self.__overlap)
+            words.extend(w for w in future.result() if _owns(w, core))
+        logger.debug(f"Tiled OCR. tiles={len(boxes)}, words={len(words)}")
+        return WordIndex(_merge(words), frame.left, frame.top)
+
+    def close(self):
+        with self.__lock:
+            if self.__executor:
+                self.__executor.shutdown()
+                self.__executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class OcrCache:
+    """
+    OCR results keyed by window and image hash, so that several Text
+    lookups on an unchanged window share one OCR pass.
+
+    size: number of OCR results kept
+    engine: callable(frame) returning a WordIndex, e.g. TiledOcr().
+            a single tesseract run over the frame if not given.
+    """
+
+    def __init__(self, *, size=16, config=OCR_CONFIG, engine=None):
+        self.__size = size
+        self.__engine = engine if engine else lambda frame: ocr(frame, config=config)
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def index(self, window, frame: Frame) -> WordIndex:
+        key = (window, frame.left, frame.top, frame.digest())
+        with self.__lock:
+            index = self.__entries.get(key)
+            if index is not None:
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+                return index
+            self.__misses += 1
+
+        index = self.__engine(frame)
+        with self.__lock:
+            self.__entries[key] = index
+            while len(self.__entries) > self.__size:
+                self.__entries.popitem(last=False)
+        return index
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self):
+        with self.__lock:
+            return {"hits": self.__hits, "misses": self.__misses}
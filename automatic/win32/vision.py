@@ -0,0 +1,267 @@
+
+import os
+import hashlib
+import threading
+from typing import Union
+
+import cv2
+import numpy as np
+from PIL import ImageGrab
+
+from automatic.utils import Logger, LOGGER_AUTOMATIC
+
+logger = Logger.get(LOGGER_AUTOMATIC)
+
+
+class Template:
+    """
+    Template image decoded once, with its grayscale variant.
+    """
+
+    def __init__(self, path):
+        color = cv2.imread(path, cv2.IMREAD_COLOR)
+        if color is None:
+            raise FileNotFoundError(f"Can't read a template image. path={path}")
+        self.path = path
+        self.color = color
+        self.gray = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY)
+
+    def image(self, grayscale):
+        return self.gray if grayscale else self.color
+
+
+class TemplateCache:
+    def __init__(self):
+        self.__lock = threading.Lock()
+        # path -> (mtime, Template)
+        self.__templates = {}
+
+    def get(self, path) -> Template:
+        mtime = os.path.getmtime(path)
+        with self.__lock:
+            entry = self.__templates.get(path)
+            if entry and entry[0] == mtime:
+                return entry[1]
+        template = Template(path)
+        with self.__lock:
+            self.__templates[path] = (mtime, template)
+        return template
+
+    def clear(self):
+        with self.__lock:
+            self.__templates.clear()
+
+
+class Match:
+    """
+    x, y: center in screen coordinates
+    box: (left, top, width, height) in screen coordinates
+    """
+
+    def __init__(self, x, y, score, box):
+        self.x = x
+        self.y = y
+        self.score = score
+        self.box = box
+
+    def __str__(self):
+        return f"Match(x={self.x}, y={self.y}, score={self.score:.3f})"
+
+
+class Frame:
+    """
+    Captured pixels(BGR) and where they are on the screen.
+    """
+
+    def __init__(self, image: np.ndarray, left=0, top=0, *, gray: np.ndarray = None):
+        self.image = image
+        self.left = left
+        self.top = top
+        self.__gray = gray
+        self.__digest = None
+
+    def digest(self) -> bytes:
+        """
+        Hash of the pixels.
+        """
+        if self.__digest is None:
+            data = self.image.tobytes()
+            self.__digest = hashlib.blake2b(data, digest_size=16).digest()
+        return self.__digest
+
+    def gray(self):
+        if self.__gray is None:
+            self.__gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+        return self.__gray
+
+    def image_of(self, grayscale):
+        return self.gray() if grayscale else self.image
+
+    def crop(self, region) -> 'Frame':
+        """
+        Part of the frame in region (left, top, right, bottom) of the screen.
+        The grayscale image is shared when it's already converted.
+        """
+        if not region:
+            return self
+        h, w = self.image.shape[:2]
+        left = min(max(0, int(region[0]) - self.left), w)
+        top = min(max(0, int(region[1]) - self.top), h)
+        right = min(max(left, int(region[2]) - self.left), w)
+        bottom = min(max(top, int(region[3]) - self.top), h)
+        gray = self.__gray[top:bottom, left:right] if self.__gray is not None else None
+        return Frame(self.image[top:bottom, left:right], self.left + left, self.top + top, gray=gray)
+
+
+def union(regions):
+    """
+    Bounding box of the regions. None(the whole screen) if any of them is None.
+    """
+    if not regions or any(not r for r in regions):
+        return None
+    return (min(r[0] for r in regions), min(r[1] for r in regions),
+            max(r[2] for r in regions), max(r[3] for r in regions))
+
+
+class ChangeGate:
+    """
+    Skips an expensive search(template matching, OCR) when the captured
+    pixels didn't change since the last failed attempt with the same key.
+
+    tolerance: 0 compares exact pixels by hash. Otherwise frames are
+               downsampled and considered unchanged when the mean absolute
+               difference is at or below tolerance(0-255).
+    """
+
+    def __init__(self, *, tolerance=0, scale=0.25):
+        self.__tolerance = tolerance
+        self.__scale = scale
+        self.__lock = threading.Lock()
+        # key -> signature of the frame of the last failed search
+        self.__failed = {}
+        self.__skipped = 0
+        self.__executed = 0
+
+    def __signature(self, frame: Frame):
+        if not self.__tolerance:
+            return (frame.image.shape, frame.digest())
+        gray = frame.gray()
+        h, w = gray.shape[:2]
+        size = (max(1, int(w * self.__scale)), max(1, int(h * self.__scale)))
+        return cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def __same(self, a, b) -> bool:
+        if not self.__tolerance:
+            return a == b
+        if a.shape != b.shape:
+            return False
+        return float(np.mean(np.abs(a - b))) <= self.__tolerance
+
+    def check(self, key, frame: Frame):
+        """
+        Signature of the frame, or None when the search should be skipped
+        because the frame is the same as the last failed one.
+        """
+        signature = self.__signature(frame)
+        with self.__lock:
+            last = self.__failed.get(key)
+            if last is not None and self.__same(last, signature):
+                self.__skipped += 1
+                return None
+            self.__executed += 1
+        return signature
+
+    def record(self, key, signature, found):
+        with self.__lock:
+            if found:
+                self.__failed.pop(key, None)
+            else:
+                self.__failed[key] = signature
+
+    def search(self, key, frame: Frame, func):
+        """
+        Run func(frame) unless the frame is the same as the last failed one.
+        """
+        signature = self.check(key, frame)
+        if signature is None:
+            return None
+        result = func(frame)
+        self.record(key, signature, result is not None)
+        return result
+
+    def reset(self):
+        with self.__lock:
+            self.__failed.clear()
+
+    def stats(self):
+        with self.__lock:
+            return {"skipped": self.__skipped, "executed": self.__executed}
+
+
+def load_image(source) -> np.ndarray:
+    """
+    source: path of an image file or a BGR array
+    """
+    if isinstance(source, np.ndarray):
+        return source
+    image = cv2.imread(source, cv2.IMREAD_COLOR)
+    if image is None:
+        raise FileNotFoundError(f"Can't read an image. path={source}")
+    return image
+
+
+def capture(region=None, *, screenshot=None) -> Frame:
+    """
+    Capture the region (left, top, right, bottom) of the screen.
+
+    screenshot: image of the full screen(path or BGR array) used instead of
+                the live screen, e.g. for tests.
+    """
+    if screenshot is not None:
+        image = load_image(screenshot)
+        if not region:
+            return Frame(image)
+        left, top, right, bottom = [int(v) for v in region]
+        left, top = max(0, left), max(0, top)
+        return Frame(image[top:bottom, left:right], left, top)
+
+    grabbed = ImageGrab.grab(bbox=region)
+    image = cv2.cvtColor(np.array(grabbed), cv2.COLOR_RGB2BGR)
+    left, top = (int(region[0]), int(region[1])) if region else (0, 0)
+    return Frame(image, left, top)
+
+
+class Matcher:
+    """
+    Template matching with OpenCV matchTemplate on a region of the screen.
+    """
+
+    def __init__(self, templates: TemplateCache = None):
+        self.__templates = templates if templates else TemplateCache()
+
+    def templates(self) -> TemplateCache:
+        return self.__templates
+
+    def match(self, frame: Frame, path, *, grayscale=True, confidence=0.9) -> Union[Match, None]:
+        template = self.__templates.get(path).image(grayscale)
+        image = frame.image_of(grayscale)
+        th, tw = template.shape[:2]
+        if image.shape[0] < th or image.shape[1] < tw:
+            return None
+
+        result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (x, y) = cv2.minMaxLoc(result)
+        if score < confidence:
+            logger.debug(f"Template is not matched. path={path}, score={score:.3f}")
+            return None
+
+        left, top = frame.left + x, frame.top + y
+        return Match(left + tw / 2, top + th / 2, score, (left, top, tw, th))
+
+    def locate(self, path, *, region=None, grayscale=True, confidence=0.9,
+               screenshot=None) -> Union[Match, None]:
+        """
+        region: (left, top, right, bottom) to search. the whole screen if not given.
+        """
+        return self.match(capture(region, screenshot=screenshot), path,
+                          grayscale=grayscale, confidence=confidence)
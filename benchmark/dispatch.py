@@ -0,0 +1,58 @@
+"""
+Per-op overhead of Automatic dispatch.
+
+Runs exist/text on a no-op context, so the time is all in Automatic.
+usage: python -m benchmark.dispatch [iterations]
+"""
+
+import sys
+import time
+
+from automatic import Automatic
+from automatic.utils import metrics
+from automatic.common.utils import package_name
+from automatic.selenium import Context as SeleniumContext
+
+from .fakes import Element, Context
+
+
+def legacy(contexts, op, desc):
+    # Automatic._do before the dispatch cache
+    for ctx in contexts:
+        if package_name(desc) == package_name(ctx):
+            return getattr(ctx, op, None)(desc)
+
+
+def measure(name, func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<18} {elapsed / iterations * 1e9:8.0f} ns/op")
+    return elapsed
+
+
+def main(iterations=200000):
+    ctx = Context()
+    # another context to look through, as with selenium + win32
+    other = SeleniumContext.__new__(SeleniumContext)
+    contexts = [other, ctx]
+    automatic = Automatic(contexts)
+    desc = Element("bench", "path")
+
+    measure("direct", lambda: ctx.exist(desc), iterations)
+    measure("legacy", lambda: legacy(contexts, "exist", desc), iterations)
+    measure("exist", lambda: automatic.exist(desc), iterations)
+    measure("text", lambda: automatic.text(desc), iterations)
+
+    metrics.latency = True
+    measure("exist(latency)", lambda: automatic.exist(desc), iterations)
+    metrics.latency = False
+
+    metrics.enabled = False
+    measure("exist(no metrics)", lambda: automatic.exist(desc), iterations)
+    metrics.enabled = True
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
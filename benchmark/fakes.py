@@ -0,0 +1,279 @@
+"""
+In-process fakes for benchmarks. No browser or screen needed.
+"""
+
+import time
+from collections import Counter
+
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import NoSuchWindowException, NoAlertPresentException
+
+from automatic.common import Descriptor
+from automatic.selenium.resolver import FIND_ELEMENTS_SCRIPT
+from automatic.selenium.scripts import CLICKS_SCRIPT, ASYNC_CLICKS_SCRIPT, FILL_SCRIPT, ALIVE_SCRIPT, \
+    FIRST_OF_SCRIPT, SETTLE_SCRIPT
+
+
+class Element(Descriptor):
+    def by(self) -> str:
+        return "element"
+
+
+class Context:
+    """
+    Context doing nothing, to measure the overhead around it.
+    """
+
+    def exist(self, desc):
+        return True
+
+    def text(self, desc):
+        return ""
+
+
+# ---------------------
+# ---- WebDriver ------
+# ---------------------
+
+class FakeElement(WebElement):
+    """
+    Element of a FakeDocument. Every call is a command of its driver.
+    """
+
+    def __init__(self, driver, tag="div", *, text="", attrs=None,
+                 displayed=True, enabled=True, document=None):
+        # WebElement.__init__ is not called, there is no remote session
+        self._driver = driver
+        self._id = str(id(self))
+        self.tag = tag
+        self.value = text
+        self.attrs = attrs if attrs else {}
+        self.displayed = displayed
+        self.enabled = enabled
+        # document of a frame
+        self.document = document
+        self.clicks = 0
+
+    @property
+    def tag_name(self):
+        self._driver.execute("getElementTagName")
+        return self.tag
+
+    @property
+    def text(self):
+        self._driver.execute("getElementText")
+        return self.value
+
+    def click(self):
+        self._driver.execute("clickElement")
+        self.clicks += 1
+
+    def clear(self):
+        self._driver.execute("clearElement")
+        self.value = ""
+
+    def send_keys(self, *value):
+        self._driver.execute("sendKeysToElement")
+        self.value += "".join(value)
+
+    def get_attribute(self, name):
+        self._driver.execute("getElementAttribute")
+        return self.attrs.get(name)
+
+    def is_displayed(self):
+        self._driver.execute("isElementDisplayed")
+        return self.displayed
+
+    def is_enabled(self):
+        self._driver.execute("isElementEnabled")
+        return self.enabled
+
+
+class FakeDocument:
+    """
+    Elements by (by, path), e.g. ("xpath", "//a").
+    """
+
+    def __init__(self, title="", url="", html="<html></html>"):
+        self.title = title
+        self.url = url
+        self.html = html
+        self.elements = {}
+        # time of the last DOM change, for settle checks
+        self.changed = time.monotonic()
+
+    def add(self, by, path, elements):
+        self.elements.setdefault((by, path), []).extend(elements)
+        return elements
+
+    def find(self, by, path):
+        return self.elements.get((by, path), [])
+
+    def remove(self, by, path):
+        return self.elements.pop((by, path), [])
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.__driver = driver
+
+    def window(self, handle):
+        self.__driver.execute("switchToWindow")
+        if handle not in self.__driver.windows:
+            raise NoSuchWindowException(handle)
+        self.__driver.handle = handle
+        self.__driver.frames = []
+
+    def frame(self, elem: FakeElement):
+        self.__driver.execute("switchToFrame")
+        self.__driver.frames.append(elem)
+
+    def default_content(self):
+        self.__driver.execute("switchToFrame")
+        self.__driver.frames = []
+
+    @property
+    def alert(self):
+        self.__driver.execute("getAlertText")
+        raise NoAlertPresentException()
+
+
+class FakeTimeouts:
+    script = 30
+
+
+class FakeDriver:
+    """
+    WebDriver simulating a round trip latency for every command.
+
+    latency: seconds per command
+    windows: handle -> FakeDocument
+    """
+
+    def __init__(self, *, latency=0.0):
+        self.latency = latency
+        self.commands = 0
+        # command name -> number of calls
+        self.counts = Counter()
+        self.windows = {}
+        self.handle = None
+        # entered frame elements
+        self.frames = []
+        self.switch_to = FakeSwitchTo(self)
+        self.timeouts = FakeTimeouts()
+
+    def execute(self, driver_command, params=None):
+        self.commands += 1
+        self.counts[driver_command] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {"value": None}
+
+    def open(self, handle, document: FakeDocument):
+        self.windows[handle] = document
+        if not self.handle:
+            self.handle = handle
+        return document
+
+    def document(self) -> FakeDocument:
+        if self.frames:
+            return self.frames[-1].document
+        return self.windows[self.handle]
+
+    @property
+    def current_window_handle(self):
+        self.execute("getCurrentWindowHandle")
+        if self.handle not in self.windows:
+            raise NoSuchWindowException(self.handle)
+        return self.handle
+
+    @property
+    def window_handles(self):
+        self.execute("getWindowHandles")
+        return list(self.windows)
+
+    @property
+    def title(self):
+        self.execute("getTitle")
+        return self.windows[self.handle].title
+
+    @property
+    def current_url(self):
+        self.execute("getCurrentUrl")
+        return self.windows[self.handle].url
+
+    @property
+    def page_source(self):
+        self.execute("getPageSource")
+        return self.document().html
+
+    def get(self, url):
+        self.execute("get")
+        self.windows[self.handle].url = url
+
+    def set_script_timeout(self, seconds):
+        self.execute("setTimeouts")
+        self.timeouts.script = seconds
+
+    def __find(self, by, path, filter):
+        elems = self.document().find(by, path)
+        if filter:
+            elems = [e for e in elems if e.displayed and e.enabled]
+        return elems
+
+    def __fill(self, by, path, filter, first, value):
+        elems = self.__find(by, path, filter)
+        if not elems:
+            return ["missing", None]
+        if len(elems) > 1 and not first:
+            return ["ambiguous", None]
+        if elems[0].attrs.get("type") in ["checkbox", "radio"]:
+            elems[0].attrs["checked"] = value is True or str(value).lower() in ["true", "on", "1", "yes", "checked"]
+            return ["set", elems[0]]
+        if elems[0].tag not in ["input", "textarea"]:
+            return ["keys", elems[0]]
+        elems[0].value = value
+        return ["set", elems[0]]
+
+    def execute_script(self, script, *args):
+        self.execute("executeScript")
+        if script == FIND_ELEMENTS_SCRIPT:
+            return self.__find(*args)
+        if script == CLICKS_SCRIPT:
+            for elem in args[0]:
+                elem.clicks += 1
+            return [True] * len(args[0])
+        if script == FILL_SCRIPT:
+            return [self.__fill(*field) for field in args[0]]
+        if script == ALIVE_SCRIPT:
+            elem, by, path, filter, single = args
+            found = self.__find(by, path, filter)
+            return elem in found and (not single or len(found) == 1)
+        if script == FIRST_OF_SCRIPT:
+            for i, (by, path, filter, single) in enumerate(args[0]):
+                elems = self.__find(by, path, filter)
+                if elems and (len(elems) == 1 or not single):
+                    return [i, elems[0]]
+            return None
+        if script == SETTLE_SCRIPT:
+            return ["complete", 0, (time.monotonic() - self.document().changed) * 1000]
+        if script == "return 1;":
+            return 1
+        if script == "arguments[0].click();":
+            args[0].clicks += 1
+        return None
+
+    def execute_async_script(self, script, *args):
+        self.execute("executeAsyncScript")
+        if script == ASYNC_CLICKS_SCRIPT:
+            for elem in args[0]:
+                elem.clicks += 1
+            return [True] * len(args[0])
+        return None
+
+    def save_screenshot(self, path):
+        self.execute("takeScreenshot")
+        return False
+
+    def quit(self):
+        self.execute("quit")
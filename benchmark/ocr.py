@@ -0,0 +1,65 @@
+"""
+Single-shot vs tiled OCR on stored screenshots.
+
+Reports seconds per screenshot and how many words of the single-shot pass
+the tiled pass found too. Needs tesseract installed.
+usage: python -m benchmark.ocr SCREENSHOT [SCREENSHOT ...]
+                               [--size PX] [--overlap PX] [--workers N]
+                               [--mode process|thread] [--repeat N]
+"""
+
+import sys
+import time
+import argparse
+
+from automatic.win32.vision import Frame, load_image
+from automatic.win32.ocr import TiledOcr, ocr, ensure_tesseract
+
+
+def measure(func, frame, repeat):
+    index = None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        index = func(Frame(frame.image))
+    return (time.perf_counter() - start) / repeat, index
+
+
+def recall(expected, actual) -> float:
+    """
+    Fraction of the expected words found by the other pass.
+    """
+    words = [w.text for w in expected.words()]
+    if not words:
+        return 1.0
+    found = {w.text for w in actual.words()}
+    return sum(1 for w in words if w in found) / len(words)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("screenshots", nargs="+")
+    parser.add_argument("--size", type=int, default=1024, help="tile size in pixels")
+    parser.add_argument("--overlap", type=int, default=64, help="tile overlap in pixels")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--mode", default="process", choices=["process", "thread"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    ensure_tesseract()
+    print(f"{'screenshot':<32}{'size':>12}{'single':>10}{'tiled':>10}{'speedup':>10}{'recall':>8}")
+    with TiledOcr(size=args.size, overlap=args.overlap, workers=args.workers,
+                  mode=args.mode) as tiled:
+        # start the workers before measuring
+        tiled(Frame(load_image(args.screenshots[0])))
+        for path in args.screenshots:
+            frame = Frame(load_image(path))
+            h, w = frame.image.shape[:2]
+            single, expected = measure(ocr, frame, args.repeat)
+            split, actual = measure(tiled, frame, args.repeat)
+            print(f"{path[-32:]:<32}{f'{w}x{h}':>12}{single:>10.2f}{split:>10.2f}"
+                  f"{single / split:>10.2f}{recall(expected, actual):>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
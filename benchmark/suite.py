@@ -0,0 +1,192 @@
+"""
+Benchmarks of the selenium Context hot paths on a FakeDriver.
+
+Measures ops/sec and WebDriver commands per op, saves baselines and flags
+regressions against them.
+usage: python -m benchmark [--latency MS] [--dom N] [--windows N]
+                           [--iterations N] [--save] [--baseline PATH]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from automatic import Automatic
+from automatic.selenium import Context, Xpath, Id, Title
+
+from .fakes import FakeDriver, FakeDocument, FakeElement
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def table_html(rows):
+    body = "".join(f"<tr><td>{i}</td><td>row {i}</td></tr>" for i in range(rows))
+    return f"<table><tr><th>id</th><th>name</th></tr>{body}</table>"
+
+
+def build(*, latency, dom, windows):
+    """
+    A driver with a main window, an iframe and extra windows.
+    """
+    driver = FakeDriver(latency=latency)
+
+    fields = "".join(f'<input id="field{i}">' for i in range(20))
+    main = driver.open("main", FakeDocument("Main", "https://main",
+                                            f"<html><body><button>ok</button>{fields}</body></html>"))
+    main.add("xpath", "//button", [FakeElement(driver, "button", text="ok")])
+    main.add("xpath", "//input", [FakeElement(driver, "input")])
+    for i in range(20):
+        main.add("id", f"field{i}", [FakeElement(driver, "input")])
+    main.add("xpath", "//row", [FakeElement(driver, "tr", displayed=i % 2 == 0)
+                               for i in range(dom)])
+    main.add("xpath", "//table", [FakeElement(driver, "table",
+                                              attrs={"outerHTML": table_html(dom)})])
+
+    framed = FakeDocument()
+    framed.add("xpath", "//button", [FakeElement(driver, "button", text="framed")])
+    main.add("xpath", "//iframe", [FakeElement(driver, "iframe", document=framed)])
+
+    for i in range(windows):
+        title = "Target" if i == windows - 1 else f"Other {i}"
+        doc = driver.open(f"window{i}", FakeDocument(title, f"https://other/{i}"))
+        doc.add("xpath", "//button", [FakeElement(driver, "button", text=title)])
+
+    return driver
+
+
+def scenarios():
+    button = Xpath("button", "//button")
+    field = Xpath("input", "//input")
+    rows = Xpath("rows", "//row", multiple=True)
+    table = Xpath("table", "//table")
+    frame = Xpath("frame", "//iframe")
+    framed = Xpath("framed button", "//button", parent=frame)
+    fields = [Id(f"field {i}", f"field{i}") for i in range(20)]
+    outcomes = [Xpath("error", "//error"), Xpath("banner", "//banner"), button]
+    window = Title("target", "Target")
+    windowed = Xpath("windowed button", "//button", parent=window)
+
+    def type_all(a: Automatic):
+        for field in fields:
+            a.type(field, "value")
+
+    def read_all(a: Automatic):
+        for field in fields:
+            a.exist(field)
+
+    def snapshot_reads(a: Automatic):
+        with a.snapshot():
+            read_all(a)
+
+    def alternate(a: Automatic, first, second):
+        a.text(first)
+        a.text(second)
+
+    return {
+        "click": lambda a: a.click(button),
+        "clicks": lambda a: a.clicks(rows),
+        "clicks_batch": lambda a: a.clicks(rows, batch=True),
+        "type": lambda a: a.type(field, "hello"),
+        "type_form": type_all,
+        "fill_form": lambda a: a.fill({field: "value" for field in fields}),
+        "text": lambda a: a.text(button),
+        "table": lambda a: a.table(table),
+        "exist": lambda a: a.exist(button),
+        "reads": read_all,
+        "snapshot_reads": snapshot_reads,
+        "count": lambda a: a.count(rows),
+        "first_of": lambda a: a.first_of(outcomes),
+        "frame": lambda a: a.text(framed),
+        "frame_switch": lambda a: alternate(a, framed, button),
+        "window": lambda a: a.text(windowed),
+        "window_switch": lambda a: alternate(a, windowed, button),
+    }
+
+
+def run(*, latency=0.001, dom=200, windows=10, iterations=20, only=None):
+    results = {}
+    for name, scenario in scenarios().items():
+        if only and name not in only:
+            continue
+        driver = build(latency=latency, dom=dom, windows=windows)
+        automatic = Automatic([Context(driver, timeout=1, differ=0)])
+        # warm up window index and activation
+        scenario(automatic)
+
+        commands = driver.commands
+        start = time.perf_counter()
+        for _ in range(iterations):
+            scenario(automatic)
+        elapsed = time.perf_counter() - start
+
+        results[name] = {
+            "ops_per_sec": iterations / elapsed,
+            "commands_per_op": (driver.commands - commands) / iterations,
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Names of scenarios slower than the baseline by more than tolerance, or
+    issuing more commands per op.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(name)
+        elif result["commands_per_op"] > base["commands_per_op"] + 1e-9:
+            regressions.append(name)
+    return regressions
+
+
+def report(results, baseline, regressions):
+    print(f"{'scenario':<16}{'ops/sec':>12}{'base':>12}{'cmds/op':>10}{'base':>10}")
+    for name, result in results.items():
+        base = baseline.get(name, {})
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<16}{result['ops_per_sec']:>12.1f}"
+              f"{base.get('ops_per_sec', float('nan')):>12.1f}"
+              f"{result['commands_per_op']:>10.1f}"
+              f"{base.get('commands_per_op', float('nan')):>10.1f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=1.0, help="ms per WebDriver command")
+    parser.add_argument("--dom", type=int, default=200, help="elements matched by list lookups")
+    parser.add_argument("--windows", type=int, default=10, help="extra windows")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed ops/sec drop")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="save results as the baseline")
+    parser.add_argument("scenarios", nargs="*", help="run only these scenarios")
+    args = parser.parse_args(argv)
+
+    results = run(latency=args.latency / 1000, dom=args.dom, windows=args.windows,
+                  iterations=args.iterations, only=args.scenarios)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.tolerance)
+    report(results, baseline, regressions)
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(dict(baseline, **results), f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+from automatic import Automatic
+from automatic.selenium import Context, Title, Xpath
+
+from benchmark.fakes import FakeDriver, FakeDocument, FakeElement
+
+
+def _automatic():
+    driver = FakeDriver()
+    main = driver.open("main", FakeDocument("Main", "https://main"))
+    main.add("xpath", "//p", [FakeElement(driver, "p", text="main")])
+    framed = FakeDocument()
+    framed.add("xpath", "//p", [FakeElement(driver, "p", text="framed")])
+    main.add("xpath", "//iframe", [FakeElement(driver, "iframe", document=framed)])
+    other = driver.open("other", FakeDocument("Other", "https://other"))
+    other.add("xpath", "//p", [FakeElement(driver, "p", text="other")])
+    ctx = Context(driver, timeout=0.2, differ=0)
+    return driver, ctx, Automatic([ctx])
+
+
+FRAME = Xpath("frame", "//iframe")
+MAIN = Xpath("main", "//p")
+FRAMED = Xpath("framed", "//p", parent=FRAME)
+WINDOWED = Xpath("windowed", "//p", parent=Title("other", "Other"))
+
+
+def test_repeated_ops_do_not_switch():
+    driver, ctx, automatic = _automatic()
+    assert automatic.text(FRAMED) == "framed"
+    assert ctx.active_state() == ("main", (FRAME,))
+
+    driver.counts.clear()
+    for _ in range(5):
+        assert automatic.text(FRAMED) == "framed"
+    assert driver.counts["switchToFrame"] == 0
+    assert driver.counts["switchToWindow"] == 0
+
+
+def test_switches_only_when_the_parent_changes():
+    driver, ctx, automatic = _automatic()
+    assert automatic.text(MAIN) == "main"
+    assert automatic.text(FRAMED) == "framed"
+    assert automatic.text(WINDOWED) == "other"
+    assert ctx.active_state()[0] == "other"
+    assert automatic.text(MAIN) == "main"
+    assert ctx.active_state() == ("main", ())
+
+    driver.counts.clear()
+    automatic.text(MAIN)
+    automatic.text(MAIN)
+    assert driver.counts["switchToFrame"] == 0
+    assert driver.counts["switchToWindow"] == 0
+
+
+def test_closed_window_is_activated_again():
+    driver, ctx, automatic = _automatic()
+    assert automatic.text(WINDOWED) == "other"
+    # the tracked window goes away under the context
+    del driver.windows["other"]
+    driver.handle = "main"
+    assert automatic.text(MAIN) == "main"
+    assert ctx.active_state()[0] == "main"
+
+
+def test_invalidate_activation():
+    driver, ctx, automatic = _automatic()
+    automatic.text(FRAMED)
+    ctx.invalidate_activation()
+    driver.counts.clear()
+    assert automatic.text(FRAMED) == "framed"
+    assert driver.counts["switchToFrame"] >= 1
@@ -0,0 +1,66 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from automatic import AsyncAutomatic
+from automatic.selenium import Context, Xpath
+from automatic.utils import metrics
+
+from benchmark.fakes import FakeDriver, FakeDocument, FakeElement
+
+
+def _context(text="hello"):
+    driver = FakeDriver()
+    page = driver.open("main", FakeDocument("Main", "https://main"))
+    page.add("xpath", "//p", [FakeElement(driver, "p", text=text)])
+    return Context(driver, timeout=0.5, differ=0)
+
+
+def test_probe_does_not_await_the_differ():
+    async def run():
+        async with AsyncAutomatic([_context()]) as automatic:
+            desc = Xpath("p", "//p", differ=0.5)
+            start = time.monotonic()
+            assert await automatic.exist(desc, probe=True)
+            probed = time.monotonic() - start
+            start = time.monotonic()
+            assert await automatic.exist(desc)
+            return probed, time.monotonic() - start
+
+    probed, waited = asyncio.run(run())
+    assert probed < 0.3
+    assert waited >= 0.5
+
+
+def test_ops_are_measured_like_sync_ones():
+    async def run():
+        async with AsyncAutomatic([_context()]) as automatic:
+            return await automatic.text(Xpath("p", "//p"))
+
+    metrics.reset()
+    metrics.latency = True
+    try:
+        assert asyncio.run(run()) == "hello"
+        hist = metrics.histogram("automatic_op_seconds", op="text", desc="p",
+                                 context="selenium")
+        assert hist.count == 1
+    finally:
+        metrics.latency = False
+        metrics.reset()
+
+
+def test_sessions_share_an_executor():
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    async def session(text):
+        automatic = AsyncAutomatic([_context(text)], executor=executor)
+        desc = Xpath("p", "//p")
+        return await asyncio.gather(*[automatic.text(desc) for _ in range(5)])
+
+    async def run():
+        return await asyncio.gather(session("a"), session("b"))
+
+    try:
+        assert asyncio.run(run()) == [["a"] * 5, ["b"] * 5]
+    finally:
+        executor.shutdown()
@@ -0,0 +1,75 @@
+from automatic import Automatic
+from automatic.selenium import Context, Xpath
+
+from benchmark.fakes import FakeDriver, FakeDocument, FakeElement
+
+
+def _automatic(cache_size=256):
+    driver = FakeDriver()
+    page = driver.open("main", FakeDocument("Main", "https://main"))
+    ctx = Context(driver, timeout=0.2, differ=0, cache_size=cache_size)
+    return driver, page, ctx, Automatic([ctx])
+
+
+def test_hit_is_one_probe():
+    driver, page, ctx, automatic = _automatic()
+    page.add("xpath", "//p", [FakeElement(driver, "p", text="hello")])
+    desc = Xpath("p", "//p")
+    assert automatic.text(desc) == "hello"
+
+    driver.counts.clear()
+    for _ in range(5):
+        assert automatic.text(desc) == "hello"
+    # the alive probe proves the element and its frame, no lookup
+    assert driver.counts["executeScript"] == 5
+    assert driver.counts["getElementText"] == 5
+    assert ctx.cache_stats()["hits"] == 5
+
+
+def test_disabled_cache_looks_up_every_time():
+    driver, page, ctx, automatic = _automatic(cache_size=0)
+    page.add("xpath", "//p", [FakeElement(driver, "p", text="hello")])
+    desc = Xpath("p", "//p")
+    for _ in range(3):
+        assert automatic.text(desc) == "hello"
+    assert ctx.cache_stats()["hits"] == 0
+
+
+def test_replaced_element_is_stale():
+    driver, page, ctx, automatic = _automatic()
+    page.add("xpath", "//p", [FakeElement(driver, "p", text="old")])
+    desc = Xpath("p", "//p")
+    assert automatic.text(desc) == "old"
+
+    # re-rendered: the cached element doesn't match anymore
+    page.remove("xpath", "//p")
+    page.add("xpath", "//p", [FakeElement(driver, "p", text="new")])
+    assert automatic.text(desc) == "new"
+    assert ctx.cache_stats()["stale"] == 1
+
+
+def test_removed_element_is_not_served():
+    driver, page, ctx, automatic = _automatic()
+    page.add("xpath", "//p", [FakeElement(driver, "p", text="gone")])
+    desc = Xpath("p", "//p")
+    assert automatic.exist(desc)
+
+    page.remove("xpath", "//p")
+    assert not automatic.exist(desc)
+
+
+def test_duplicate_match_is_rejected():
+    driver, page, ctx, automatic = _automatic()
+    first = FakeElement(driver, "button", text="first")
+    page.add("xpath", "//button", [first])
+    desc = Xpath("button", "//button")
+    clickable = Xpath("clickable", "//button", clickable=True)
+    assert automatic.text(desc) == "first"
+    assert automatic.text(clickable) == "first"
+
+    # a second match makes the plain descriptor ambiguous, like a lookup
+    page.add("xpath", "//button", [FakeElement(driver, "button", text="second")])
+    assert not automatic.exist(desc, probe=True)
+    # the first clickable one is still the answer
+    automatic.click(clickable)
+    assert first.clicks == 1
@@ -0,0 +1,79 @@
+import os
+import gzip
+import threading
+
+from automatic.utils.capture import CaptureWriter
+
+
+def test_writes_compressed_text_and_raw_bytes(tmp_path):
+    writer = CaptureWriter(str(tmp_path))
+    paths = writer.submit("s1", "click", {"html": "<html></html>", "png": lambda: b"\x89PNG"})
+    writer.flush()
+
+    html, png = paths
+    assert html.endswith("click.s1.0.html.gz")
+    with gzip.open(html, "rb") as f:
+        assert f.read() == b"<html></html>"
+    with open(png, "rb") as f:
+        assert f.read() == b"\x89PNG"
+
+
+def test_ring_per_session_and_base(tmp_path):
+    writer = CaptureWriter(str(tmp_path), ring=2, compress=False)
+    paths = [writer.submit("s1", "click", {"txt": str(i)})[0] for i in range(3)]
+    other = writer.submit("s2", "click", {"txt": "other"})[0]
+    writer.flush()
+
+    # the third capture overwrites the first one
+    assert paths[0] == paths[2]
+    assert len(set(paths)) == 2
+    with open(paths[0]) as f:
+        assert f.read() == "2"
+    assert other.endswith("click.s2.0.txt")
+    assert sorted(os.listdir(tmp_path)) == ["click.s1.0.txt", "click.s1.1.txt", "click.s2.0.txt"]
+
+
+def test_disk_cap_removes_oldest(tmp_path):
+    writer = CaptureWriter(str(tmp_path), ring=100, max_bytes=250, compress=False)
+    paths = []
+    for i in range(5):
+        paths += writer.submit("s1", "capture", {"txt": "x" * 100})
+        writer.flush()
+
+    assert [os.path.exists(p) for p in paths] == [False, False, False, True, True]
+    total = sum(os.path.getsize(os.path.join(tmp_path, name)) for name in os.listdir(tmp_path))
+    assert total <= 250
+
+
+def test_full_queue_drops_captures(tmp_path):
+    writer = CaptureWriter(str(tmp_path), queue_size=1, compress=False)
+    release = threading.Event()
+    # keep the writer thread busy on the first capture
+    writer.submit("s1", "slow", {"txt": lambda: release.wait(5) and "slow"})
+    for i in range(5):
+        writer.submit("s1", "fast", {"txt": str(i)})
+    release.set()
+    writer.flush()
+
+    assert writer.dropped() >= 3
+
+
+def test_disk_cap_counts_earlier_runs(tmp_path):
+    old = [tmp_path / f"capture.old{i}.0.txt" for i in range(3)]
+    for i, path in enumerate(old):
+        path.write_text("x" * 100)
+        os.utime(path, (1000 + i, 1000 + i))
+    other = tmp_path / "notes.md"
+    other.write_text("y" * 1000)
+
+    writer = CaptureWriter(str(tmp_path), max_bytes=250, compress=False)
+    writer.flush()
+    # on start, the oldest captures of earlier runs go over the cap
+    assert [p.exists() for p in old] == [False, True, True]
+
+    path = writer.submit("new", "capture", {"txt": "z" * 100})[0]
+    writer.flush()
+    assert [p.exists() for p in old] == [False, False, True]
+    assert os.path.exists(path)
+    # files which aren't captures are left alone
+    assert other.exists()
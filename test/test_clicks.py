@@ -0,0 +1,36 @@
+from automatic import Automatic
+from automatic.selenium import Context, Xpath
+
+from benchmark.fakes import FakeDriver, FakeDocument, FakeElement
+
+
+def _automatic(buttons=5, timeout=1):
+    driver = FakeDriver()
+    page = driver.open("main", FakeDocument("Main", "https://main"))
+    elems = page.add("xpath", "//button", [FakeElement(driver, "button") for _ in range(buttons)])
+    ctx = Context(driver, timeout=timeout, differ=0)
+    return driver, elems, Automatic([ctx])
+
+
+def test_batch_is_one_script():
+    driver, elems, automatic = _automatic()
+    driver.counts.clear()
+    assert automatic.clicks(Xpath("buttons", "//button"), batch=True) == [True] * 5
+    assert [e.clicks for e in elems] == [1] * 5
+    assert driver.counts["clickElement"] == 0
+    assert driver.counts["executeScript"] <= 2
+
+
+def test_throttled_batch_restores_the_script_timeout():
+    driver, elems, automatic = _automatic(buttons=100, timeout=1)
+    assert automatic.clicks(Xpath("buttons", "//button"), batch=True, throttle=0.5) == [True] * 100
+    assert [e.clicks for e in elems] == [1] * 100
+    # raised for the 50s of delays, then back
+    assert driver.counts["setTimeouts"] == 2
+    assert driver.timeouts.script == 30
+
+
+def test_enough_script_timeout_is_kept():
+    driver, elems, automatic = _automatic(buttons=2)
+    automatic.clicks(Xpath("buttons", "//button"), batch=True, throttle=0.1)
+    assert driver.counts["setTimeouts"] == 0
@@ -0,0 +1,93 @@
+import time
+
+from automatic import Automatic
+from automatic.selenium import Context, Xpath
+
+from benchmark.fakes import FakeDriver, FakeDocument, FakeElement
+
+
+def _automatic(timeout=0.5):
+    driver = FakeDriver()
+    page = driver.open("main", FakeDocument("Form", "https://form"))
+    ctx = Context(driver, timeout=timeout, differ=0)
+    return driver, page, Automatic([ctx])
+
+
+def test_fields_are_set_by_one_script():
+    driver, page, automatic = _automatic()
+    user = FakeElement(driver, "input")
+    password = FakeElement(driver, "input")
+    agree = FakeElement(driver, "input", attrs={"type": "checkbox"})
+    page.add("xpath", "//user", [user])
+    page.add("xpath", "//password", [password])
+    page.add("xpath", "//agree", [agree])
+    driver.counts.clear()
+
+    results = automatic.fill({
+        Xpath("user", "//user"): "alice",
+        Xpath("password", "//password"): "secret",
+        Xpath("agree", "//agree"): True,
+    })
+    assert list(results.values()) == ["set", "set", "set"]
+    assert (user.value, password.value, agree.attrs["checked"]) == ("alice", "secret", True)
+    assert driver.counts["executeScript"] == 1
+    assert driver.counts["sendKeysToElement"] == 0
+
+
+def test_outcomes_of_fields_the_script_cant_set():
+    driver, page, automatic = _automatic()
+    page.add("xpath", "//twice", [FakeElement(driver, "input"), FakeElement(driver, "input")])
+    editable = FakeElement(driver, "div")
+    page.add("xpath", "//editable", [editable])
+
+    twice, typed = Xpath("twice", "//twice"), Xpath("editable", "//editable")
+
+    results = automatic.fill({twice: "a", typed: "text"})
+    assert results == {twice: "ambiguous", typed: "typed"}
+    assert editable.value == "text"
+    assert driver.counts["sendKeysToElement"] == 1
+
+
+def test_keystrokes():
+    driver, page, automatic = _automatic()
+    field = FakeElement(driver, "input")
+    page.add("xpath", "//field", [field])
+    desc = Xpath("field", "//field")
+
+    assert automatic.fill({desc: "typed"}, keystrokes=[desc]) == {desc: "typed"}
+    assert field.value == "typed"
+    assert driver.counts["sendKeysToElement"] == 1
+
+
+def test_missing_fields_share_one_timeout():
+    driver, page, automatic = _automatic(timeout=0.3)
+    page.add("xpath", "//user", [FakeElement(driver, "input")])
+    user = Xpath("user", "//user")
+    values = {Xpath(f"missing{i}", f"//missing{i}"): "x" for i in range(4)}
+    values[user] = "alice"
+
+    start = time.monotonic()
+    results = automatic.fill(values)
+    elapsed = time.monotonic() - start
+
+    assert results.pop(user) == "set"
+    assert list(results.values()) == ["missing"] * 4
+    # not 4 x 0.3s
+    assert elapsed < 0.6
+
+
+def test_fill_is_measured_like_other_ops():
+    from automatic.utils import metrics
+
+    driver, page, automatic = _automatic()
+    page.add("xpath", "//user", [FakeElement(driver, "input")])
+    metrics.reset()
+    metrics.latency = True
+    try:
+        automatic.fill({Xpath("user", "//user"): "alice"})
+        hist = metrics.histogram("automatic_op_seconds", op="fill", desc="fill",
+                                 context="selenium")
+        assert hist.count == 1
+    finally:
+        metrics.latency = False
+        metrics.reset()
@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+
+from automatic import Automatic
+from automatic.selenium import Context, Xpath
+from automatic import win32
+
+from benchmark.fakes import FakeDriver, FakeDocument, FakeElement
+
+
+def _automatic(*contexts):
+    driver = FakeDriver()
+    page = driver.open("main", FakeDocument("Main", "https://main"))
+    ctx = Context(driver, timeout=0, differ=0)
+    return driver, page, ctx, Automatic([ctx, *contexts])
+
+
+def test_earliest_found_descriptor_wins():
+    driver, page, ctx, automatic = _automatic()
+    banner = page.add("xpath", "//banner", [FakeElement(driver, "div")])[0]
+    page.add("xpath", "//button", [FakeElement(driver, "button")])
+    error, banner_desc, button = Xpath("error", "//error"), Xpath("banner", "//banner"), \
+        Xpath("button", "//button")
+
+    before = driver.commands
+    desc, elem = automatic.first_of([error, banner_desc, button], timeout=0)
+    assert desc is banner_desc
+    assert elem is banner
+    # one script checks the whole group
+    assert driver.commands - before <= 3
+
+
+def test_nothing_found():
+    driver, page, ctx, automatic = _automatic()
+    assert automatic.first_of([Xpath("error", "//error")], timeout=0) is None
+    assert automatic.first_of([]) is None
+
+
+def test_parallel_is_accepted_by_browser_contexts():
+    driver, page, ctx, automatic = _automatic()
+    page.add("xpath", "//button", [FakeElement(driver, "button")])
+    button = Xpath("button", "//button")
+    assert automatic.first_of([button], timeout=0, parallel=True)[0] is button
+
+
+def test_across_contexts(tmp_path):
+    image = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    screen, patch = str(tmp_path / "screen.png"), str(tmp_path / "patch.png")
+    cv2.imwrite(screen, image)
+    cv2.imwrite(patch, image[20:40, 30:60])
+    screen_ctx = win32.Context(timeout=0, screenshot=screen)
+    driver, page, ctx, automatic = _automatic(screen_ctx)
+
+    icon = win32.Image("icon", patch)
+    button = Xpath("button", "//button")
+    # the image is found, the button isn't there yet
+    desc, match = automatic.first_of([button, icon], timeout=0, parallel=True)
+    assert desc is icon
+    assert match.box == (30, 20, 30, 20)
+
+    page.add("xpath", "//button", [FakeElement(driver, "button")])
+    assert automatic.first_of([button, icon], timeout=0, parallel=True)[0] is button
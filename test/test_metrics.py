@@ -0,0 +1,95 @@
+from automatic.utils.metrics import Metrics, Histogram
+
+
+def test_histogram_cumulative_counts():
+    hist = Histogram(buckets=(0.1, 1))
+    for value in [0.05, 0.1, 0.5, 2]:
+        hist.observe(value)
+    assert hist.counts == [2, 3]
+    assert hist.count == 4
+    assert hist.sum == 2.65
+
+
+def test_prometheus_counters_and_histograms():
+    metrics = Metrics(buckets=(0.1, 1), latency=True)
+    metrics.inc("automatic_op_errors_total", op="click", context="selenium")
+    metrics.inc("automatic_op_errors_total", 2, op="click", context="selenium")
+    metrics.observe("automatic_op_seconds", 0.05, op="click", desc="ok")
+    metrics.observe("automatic_op_seconds", 0.5, op="click", desc="ok")
+
+    lines = metrics.to_prometheus().splitlines()
+    assert lines == [
+        '# TYPE automatic_op_errors_total counter',
+        'automatic_op_errors_total{context="selenium",op="click"} 3',
+        '# TYPE automatic_op_seconds histogram',
+        'automatic_op_seconds_bucket{desc="ok",op="click",le="0.1"} 1',
+        'automatic_op_seconds_bucket{desc="ok",op="click",le="1"} 2',
+        'automatic_op_seconds_bucket{desc="ok",op="click",le="+Inf"} 2',
+        'automatic_op_seconds_sum{desc="ok",op="click"} 0.55',
+        'automatic_op_seconds_count{desc="ok",op="click"} 2',
+    ]
+
+
+def test_prometheus_escapes_label_values():
+    metrics = Metrics()
+    metrics.inc("total", desc='a "quoted"\\name\n')
+    assert 'total{desc="a \\"quoted\\"\\\\name\\n"} 1' in metrics.to_prometheus()
+
+
+def test_latency_is_opt_in():
+    metrics = Metrics()
+    metrics.inc("total")
+    metrics.observe("seconds", 1)
+    with metrics.timer("seconds"):
+        pass
+    assert metrics.counter("total") == 1
+    assert metrics.histogram("seconds") is None
+
+    metrics.latency = True
+    metrics.observe("seconds", 1)
+    assert metrics.histogram("seconds").count == 1
+
+
+def test_disabled_records_nothing():
+    metrics = Metrics(latency=True)
+    metrics.enabled = False
+    metrics.inc("total")
+    metrics.observe("seconds", 1)
+    assert metrics.to_prometheus() == "\n"
+    assert metrics.counter("total") == 0
+
+
+def test_series_survives_reset():
+    metrics = Metrics(latency=True)
+    hist = metrics.series("seconds", op="exist")
+    hist.observe(0.2)
+    assert metrics.histogram("seconds", op="exist").count == 1
+
+    metrics.reset()
+    assert metrics.to_dict() == {"counters": {}, "histograms": {}}
+    hist.observe(0.3)
+    assert metrics.histogram("seconds", op="exist").count == 1
+    assert "seconds_count{op=\"exist\"} 1" in metrics.to_prometheus()
+
+
+def test_automatic_records_op_latency_when_enabled():
+    from automatic import Automatic
+    from automatic.utils import metrics
+    from benchmark.fakes import Element, Context
+
+    automatic = Automatic([Context()])
+    desc = Element("latency", "path")
+    metrics.reset()
+    try:
+        automatic.exist(desc)
+        assert metrics.histogram("automatic_op_seconds", op="exist", desc="latency",
+                                 context="benchmark") is None
+        metrics.latency = True
+        automatic.exist(desc)
+        automatic.exist(desc)
+        hist = metrics.histogram("automatic_op_seconds", op="exist", desc="latency",
+                                 context="benchmark")
+        assert hist.count == 2
+    finally:
+        metrics.latency = False
+        metrics.reset()
@@ -0,0 +1,106 @@
+import pytest
+
+from automatic.win32.ocr import WordIndex, tiles, _core, _owns, _merge
+
+
+def _data(words):
+    """
+    image_to_data output of words (text, left, top, width, height, line).
+    """
+    data = {k: [] for k in ['text', 'left', 'top', 'width', 'height',
+                            'block_num', 'par_num', 'line_num']}
+    for text, left, top, width, height, line in words:
+        data['text'].append(text)
+        data['left'].append(left)
+        data['top'].append(top)
+        data['width'].append(width)
+        data['height'].append(height)
+        data['block_num'].append(1)
+        data['par_num'].append(1)
+        data['line_num'].append(line)
+    return data
+
+
+@pytest.fixture
+def index():
+    return WordIndex(_data([
+        ("File", 0, 0, 30, 10, 1),
+        ("Save", 40, 0, 30, 10, 1),
+        ("As", 80, 0, 20, 10, 1),
+        ("", 0, 0, 0, 0, 1),
+        ("save", 0, 20, 30, 10, 2),
+        ("As", 40, 20, 20, 10, 3),
+    ]), left=100, top=200)
+
+
+def test_words_in_screen_coordinates(index):
+    words = index.words()
+    assert [w.text for w in words] == ["File", "Save", "As", "save", "As"]
+    assert (words[0].left, words[0].top) == (100, 200)
+
+
+def test_find_word(index):
+    assert index.find("Save") == [(140, 200, 170, 210)]
+    assert index.find("Missing") == []
+    assert index.find("") == []
+
+
+def test_find_phrase_in_one_line(index):
+    assert index.find("Save As") == [(140, 200, 200, 210)]
+    # "save" and the next "As" are on different lines
+    assert index.find("save As") == []
+    assert index.locate("Save As") == (170, 205)
+
+
+def test_find_ignore_case(index):
+    assert index.find("SAVE") == []
+    assert index.find("SAVE", ignore_case=True) == [(140, 200, 170, 210), (100, 220, 130, 230)]
+    assert index.find("save as", ignore_case=True) == [(140, 200, 200, 210)]
+
+
+def test_find_fuzzy(index):
+    assert index.find("Sava") == []
+    assert index.find("Sava", fuzzy=0.7) == [(140, 200, 170, 210)]
+    assert index.find("Sava", fuzzy=0.7, ignore_case=True) == [(140, 200, 170, 210), (100, 220, 130, 230)]
+    assert index.find("Fil Sav", fuzzy=0.7) == [(100, 200, 170, 210)]
+    assert index.locate("Nothing", fuzzy=0.7) is None
+
+
+def test_tiles_cover_the_image():
+    boxes = tiles(2500, 1000, size=1024, overlap=64)
+    assert boxes[0] == (0, 0, 1024, 1000)
+    assert [b[0] for b in boxes] == [0, 960, 1920]
+    assert boxes[-1][2] == 2500
+    assert tiles(500, 400, size=1024) == [(0, 0, 500, 400)]
+
+
+def test_seam_words_kept_once():
+    width, height, overlap = 2000, 100, 64
+    boxes = tiles(width, height, size=1024, overlap=overlap)
+    cores = [_core(box, width, height, overlap) for box in boxes]
+    # the cores split the image without gaps
+    assert cores[0][2] == cores[1][0]
+    assert cores[0][0] == 0 and cores[-1][2] == width
+
+    # a word in the overlap, seen by both tiles
+    seam = ("seam", 980, 10, 30, 12)
+    left = ("left", 10, 10, 30, 12)
+    right = ("right", 1500, 10, 30, 12)
+    seen = [[left, seam], [seam, right]]
+    words = [w for tile, core in zip(seen, cores) for w in tile if _owns(w, core)]
+    assert [w[0] for w in words] == ["left", "seam", "right"]
+
+
+def test_merge_groups_lines_in_reading_order():
+    words = [
+        ("world", 60, 11, 40, 10),
+        ("second", 0, 40, 50, 10),
+        ("hello", 0, 10, 40, 10),
+    ]
+    data = _merge(words)
+    assert data['text'] == ["hello", "world", "second"]
+    assert data['line_num'] == [0, 0, 1]
+
+    index = WordIndex(data)
+    assert index.find("hello world") == [(0, 10, 100, 21)]
+    assert index.find("world second") == []
@@ -0,0 +1,80 @@
+import time
+
+from automatic.common.polling import Deadline, Strategy, PollStats, poll
+
+
+def _counter(succeed_at=None, value=True):
+    calls = []
+
+    def func():
+        calls.append(time.monotonic())
+        return value if succeed_at is not None and len(calls) >= succeed_at else None
+
+    return func, calls
+
+
+def test_returns_first_accepted_value():
+    func, calls = _counter(succeed_at=3, value="found")
+    stats = PollStats()
+    assert poll(func, timeout=5, strategy=Strategy.fixed(0.01), stats=stats) == "found"
+    assert len(calls) == 3
+    assert stats.attempts == 3
+    assert stats.success()
+    assert stats.elapsed < 1
+
+
+def test_zero_timeout_tries_once():
+    func, calls = _counter()
+    stats = PollStats()
+    assert poll(func, timeout=0, stats=stats) is None
+    assert len(calls) == 1
+    assert stats.total_wait == 0
+    assert not stats.success()
+
+
+def test_last_attempt_at_the_deadline():
+    func, calls = _counter()
+    start = time.monotonic()
+    poll(func, timeout=0.2, strategy=Strategy.fixed(0.15))
+    # the second wait is cut to what's left, then one more attempt
+    assert len(calls) == 3
+    assert calls[-1] - start >= 0.2
+    assert time.monotonic() - start < 0.5
+
+
+def test_none_zero_and_exceptions_are_failures():
+    results = iter([None, 0, False, 0.0, [], "ok"])
+
+    def func():
+        value = next(results)
+        if value == []:
+            raise RuntimeError("failed attempt")
+        return value
+
+    assert poll(func, timeout=5, strategy=Strategy.fixed(0)) == "ok"
+
+
+def test_deadline_overrides_timeout():
+    func, calls = _counter()
+    start = time.monotonic()
+    poll(func, timeout=10, deadline=Deadline(0.1), strategy=Strategy.fixed(0.02))
+    assert time.monotonic() - start < 1
+
+
+def test_expired_deadline():
+    deadline = Deadline.at(time.monotonic() - 1)
+    assert deadline.expired()
+    assert deadline.remaining() == 0
+    func, calls = _counter()
+    poll(func, deadline=deadline)
+    assert len(calls) == 1
+
+
+def test_strategy_intervals():
+    strategy = Strategy(fast_probes=2, fast_interval=0.05, initial=0.1, factor=2,
+                        max_interval=0.3, jitter=0)
+    assert [strategy.interval(r) for r in range(6)] == [0.05, 0.05, 0.1, 0.2, 0.3, 0.3]
+    assert Strategy.fixed(0.2).interval(10) == 0.2
+
+    jittered = Strategy(fast_probes=0, initial=1, factor=1, max_interval=1, jitter=0.1)
+    assert all(0.9 <= jittered.interval(r) <= 1.1 for r in range(20))
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from automatic import Automatic
+from automatic.common import Settle
+from automatic.selenium import Context, Xpath
+
+from benchmark.fakes import FakeDriver, FakeDocument, FakeElement
+
+
+def _automatic():
+    driver = FakeDriver()
+    page = driver.open("main", FakeDocument("Main", "https://main"))
+    button = FakeElement(driver, "button")
+    page.add("xpath", "//button", [button])
+    ctx = Context(driver, timeout=1, differ=0)
+    return driver, page, button, ctx, Automatic([ctx])
+
+
+def test_quiet_page_settles_without_waiting_the_timeout():
+    driver, page, button, ctx, automatic = _automatic()
+    page.changed = time.monotonic() - 10
+
+    start = time.monotonic()
+    automatic.click(Xpath("button", "//button", differ=Settle(0.2, timeout=2)))
+    assert time.monotonic() - start < 0.5
+    assert button.clicks == 1
+    assert driver.counts["executeScript"] >= 1
+
+    stats = ctx.settle_stats().to_dict()
+    assert (stats["settles"], stats["timeouts"]) == (1, 0)
+    assert stats["configured"] == 2
+    assert stats["saved"] > 1.5
+
+
+def test_waits_for_the_quiet_period_after_changes():
+    driver, page, button, ctx, automatic = _automatic()
+    # the page keeps changing for 0.3s
+    stop = time.monotonic() + 0.3
+
+    def mutate():
+        while time.monotonic() < stop:
+            page.changed = time.monotonic()
+            time.sleep(0.02)
+    threading.Thread(target=mutate).start()
+
+    start = time.monotonic()
+    automatic.click(Xpath("button", "//button", differ=Settle(0.2, timeout=2)))
+    waited = time.monotonic() - start
+    assert 0.4 <= waited < 1.5
+    assert ctx.settle_stats().timeouts == 0
+
+
+def test_busy_page_times_out_and_goes_on():
+    driver, page, button, ctx, automatic = _automatic()
+    stop = time.monotonic() + 1
+
+    def mutate():
+        while time.monotonic() < stop:
+            page.changed = time.monotonic()
+            time.sleep(0.02)
+    threading.Thread(target=mutate).start()
+
+    automatic.click(Xpath("button", "//button", differ=Settle(0.2, timeout=0.3)))
+    assert button.clicks == 1
+    assert ctx.settle_stats().timeouts == 1
@@ -0,0 +1,107 @@
+from automatic import Automatic
+from automatic.selenium import Context, Xpath, Id
+from automatic.selenium.snapshot import Snapshot, SnapshotStore, text
+
+from benchmark.fakes import FakeDriver, FakeDocument, FakeElement
+
+HTML = """
+<html>
+<head><title>Form</title><script>var x = 1;</script></head>
+<body>
+  <h1 id="title">Sign   in</h1>
+  <form>
+    <input id="user" name="user">
+    <input id="token" name="token" type="hidden">
+    <button id="go" name="go" disabled>Go</button>
+    <select name="choice"><option>One</option><option>Two</option></select>
+  </form>
+  <div id="gone" style="display: none">gone</div>
+  <div id="faded" style="opacity: 0"><span>faded</span></div>
+  <div id="half" style="opacity: 0.5">half</div>
+  <p hidden>hidden</p>
+  <table id="grid"><tr><td>a</td><td>b</td></tr><tr><td>c</td><td>d</td></tr></table>
+  <p id="lines">first<br>second <b>bold</b><span style="visibility:hidden"> hidden</span></p>
+</body>
+</html>
+"""
+
+
+def test_find_by_xpath_id_and_name():
+    snapshot = Snapshot(HTML)
+    assert [e.get("id") for e in snapshot.find("xpath", "//input")] == ["user"]
+    assert [e.get("id") for e in snapshot.find("id", "title")] == ["title"]
+    assert [e.get("id") for e in snapshot.find("name", "user")] == ["user"]
+
+
+def test_filter_hidden_and_disabled():
+    snapshot = Snapshot(HTML)
+    assert snapshot.find("id", "token") == []
+    assert len(snapshot.find("id", "token", filter=False)) == 1
+    assert snapshot.find("id", "go") == []
+    assert snapshot.find("id", "gone") == []
+    assert snapshot.find("xpath", "//p[@hidden]") == []
+    assert snapshot.find("xpath", "//head/title") == []
+
+
+def test_opacity_zero_is_hidden():
+    snapshot = Snapshot(HTML)
+    assert snapshot.find("id", "faded") == []
+    assert snapshot.find("xpath", "//div[@id='faded']/span") == []
+    assert len(snapshot.find("id", "half")) == 1
+
+
+def test_options_are_displayed():
+    snapshot = Snapshot(HTML)
+    assert len(snapshot.find("xpath", "//option")) == 2
+
+
+def test_non_element_results_are_dropped():
+    snapshot = Snapshot(HTML)
+    assert snapshot.find("xpath", "//h1/text()") == []
+
+
+def test_text_like_webelement():
+    snapshot = Snapshot(HTML)
+    assert text(snapshot.find("id", "title")[0]) == "Sign in"
+    assert text(snapshot.find("id", "grid")[0]) == "a b\nc d"
+    assert text(snapshot.find("id", "lines")[0]) == "first\nsecond bold"
+    assert text(snapshot.find("xpath", "//select")[0]) == "One\nTwo"
+
+
+def test_empty_page():
+    assert Snapshot("").find("xpath", "//*") != []
+    assert Snapshot("   ").find("id", "any") == []
+
+
+def test_store_by_chain():
+    store = SnapshotStore()
+    assert not store.enabled()
+    store.enable()
+    assert store.get("default frame") is None
+    snapshot = store.put("default frame", HTML)
+    assert store.get("default frame") is snapshot
+    store.enable(False)
+    assert store.get("default frame") is None
+    assert store.stats() == {"pulls": 1, "queries": 3, "snapshots": 0}
+
+
+def test_snapshot_mode_parses_the_page_once():
+    driver = FakeDriver()
+    page = driver.open("main", FakeDocument("Form", "https://form", HTML))
+    page.add("xpath", "//button", [FakeElement(driver, "button")])
+    ctx = Context(driver, timeout=0, differ=0)
+    automatic = Automatic([ctx])
+
+    with automatic.snapshot():
+        before = driver.commands
+        assert automatic.exist(Id("user", "user"))
+        assert not automatic.exist(Id("gone", "gone"))
+        assert automatic.count(Xpath("options", "//option")) == 2
+        assert automatic.text(Id("title", "title")) == "Sign in"
+        assert ctx.snapshot_stats()["pulls"] == 1
+        assert driver.commands - before <= 3
+
+        # a click may change the page, the next read pulls it again
+        automatic.click(Xpath("button", "//button"))
+        automatic.exist(Id("user", "user"))
+        assert ctx.snapshot_stats()["pulls"] == 2
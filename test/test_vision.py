@@ -0,0 +1,137 @@
+import cv2
+import numpy as np
+import pytest
+
+from automatic.win32.vision import Matcher, Frame, ChangeGate, capture, union
+from automatic.win32 import Context, Image
+
+
+@pytest.fixture
+def screen(tmp_path):
+    """
+    Stored screenshot of random pixels, with two patches cut out of it.
+    """
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (240, 320, 3), dtype=np.uint8)
+    paths = {"screen": str(tmp_path / "screen.png"),
+             "a": str(tmp_path / "a.png"),
+             "b": str(tmp_path / "b.png"),
+             "absent": str(tmp_path / "absent.png")}
+    cv2.imwrite(paths["screen"], image)
+    cv2.imwrite(paths["a"], image[40:60, 50:80])
+    cv2.imwrite(paths["b"], image[150:170, 200:240])
+    cv2.imwrite(paths["absent"], rng.integers(0, 256, (20, 30, 3), dtype=np.uint8))
+    return paths
+
+
+def test_matcher_locates_template(screen):
+    match = Matcher().locate(screen["a"], screenshot=screen["screen"])
+    assert match is not None
+    assert match.box == (50, 40, 30, 20)
+    assert (match.x, match.y) == (65, 50)
+    assert match.score > 0.99
+
+
+def test_matcher_in_region(screen):
+    matcher = Matcher()
+    match = matcher.locate(screen["b"], region=(180, 140, 260, 180), screenshot=screen["screen"])
+    assert match.box == (200, 150, 40, 20)
+    # outside of the region
+    assert matcher.locate(screen["b"], region=(0, 0, 100, 100), screenshot=screen["screen"]) is None
+
+
+def test_matcher_color_and_confidence(screen):
+    matcher = Matcher()
+    assert matcher.locate(screen["a"], grayscale=False, screenshot=screen["screen"]).box == (50, 40, 30, 20)
+    assert matcher.locate(screen["absent"], screenshot=screen["screen"]) is None
+
+
+def test_matcher_template_larger_than_frame(screen):
+    frame = capture((0, 0, 10, 10), screenshot=screen["screen"])
+    assert Matcher().match(frame, screen["a"]) is None
+
+
+def test_frame_crop_keeps_screen_coordinates(screen):
+    frame = capture(screenshot=screen["screen"])
+    frame.gray()
+    crop = frame.crop((50, 40, 80, 60))
+    assert (crop.left, crop.top) == (50, 40)
+    assert crop.image.shape[:2] == (20, 30)
+    assert crop.gray().shape == (20, 30)
+    # clipped to the frame
+    assert frame.crop((300, 200, 400, 300)).image.shape[:2] == (40, 20)
+
+
+def test_union():
+    assert union([(0, 10, 20, 30), (5, 0, 40, 25)]) == (0, 0, 40, 30)
+    assert union([(0, 0, 1, 1), None]) is None
+    assert union([]) is None
+
+
+def test_locate_many_on_one_capture(screen):
+    ctx = Context(timeout=0, screenshot=screen["screen"])
+    a = Image("a", screen["a"])
+    b = Image("b", screen["b"], region=(180, 140, 260, 180))
+    absent = Image("absent", screen["absent"])
+
+    hits = ctx.locate_many([a, absent, b])
+    assert [desc for desc, _ in hits] == [a, b]
+    assert hits[0][1].box == (50, 40, 30, 20)
+    assert hits[1][1].box == (200, 150, 40, 20)
+
+    parallel = ctx.locate_many([a, absent, b], parallel=True)
+    assert [(desc, match.box) for desc, match in parallel] == \
+        [(desc, match.box) for desc, match in hits]
+
+    assert ctx.locate_many([absent]) == []
+
+
+def _frame(value, shape=(40, 40)):
+    return Frame(np.full(shape + (3,), value, dtype=np.uint8))
+
+
+def test_change_gate_skips_unchanged_frames():
+    gate = ChangeGate()
+    calls = []
+
+    def search(frame):
+        calls.append(frame)
+        return None
+
+    assert gate.search("key", _frame(10), search) is None
+    # same pixels after a miss: skipped
+    assert gate.search("key", _frame(10), search) is None
+    assert len(calls) == 1
+    # other keys are searched
+    gate.search("other", _frame(10), search)
+    assert len(calls) == 2
+    # changed pixels are searched
+    gate.search("key", _frame(11), search)
+    assert len(calls) == 3
+    assert gate.stats() == {"skipped": 1, "executed": 3}
+
+
+def test_change_gate_forgets_found_keys():
+    gate = ChangeGate()
+    gate.search("key", _frame(10), lambda f: None)
+    assert gate.search("key", _frame(20), lambda f: "found") == "found"
+    # a hit clears the recorded miss, so the same frame is searched again
+    assert gate.search("key", _frame(20), lambda f: "again") == "again"
+
+    gate.search("key", _frame(30), lambda f: None)
+    gate.reset()
+    assert gate.search("key", _frame(30), lambda f: "after reset") == "after reset"
+
+
+def test_change_gate_tolerance():
+    gate = ChangeGate(tolerance=2)
+    calls = []
+    gate.search("key", _frame(100), lambda f: calls.append(f))
+    # within the tolerance: skipped
+    gate.search("key", _frame(101), lambda f: calls.append(f))
+    assert len(calls) == 1
+    gate.search("key", _frame(110), lambda f: calls.append(f))
+    assert len(calls) == 2
+    # another size is a change
+    gate.search("key", _frame(110, (20, 20)), lambda f: calls.append(f))
+    assert len(calls) == 3
@@ -0,0 +1,47 @@
+import automatic.win32.context as win32
+from automatic.win32 import Context
+from automatic.win32.elements import Control, Title
+
+
+class FakeAutoit:
+    """
+    autoit functions used by a control click, recording their calls.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __record(self, name, *args, **kwargs):
+        self.calls.append((name, kwargs.get("timeout")))
+        return True
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.__record(name, *args, **kwargs)
+
+
+def _click(monkeypatch, *, timeout, probe=False):
+    autoit = FakeAutoit()
+    monkeypatch.setattr(win32, "autoit", autoit)
+    ctx = Context(timeout=timeout)
+    ctrl = Control("ok", "Button1", parent=Title("app", "App"))
+    with ctx.operation(ctrl, probe=probe):
+        ctx.click(ctrl)
+    return [call for call in autoit.calls if call[0].startswith("win_")]
+
+
+def test_waits_within_the_budget(monkeypatch):
+    calls = _click(monkeypatch, timeout=2.5)
+    assert ("win_wait", 3) in calls
+    assert ("win_activate", 3) in calls
+
+
+def test_probe_checks_once(monkeypatch):
+    calls = _click(monkeypatch, timeout=2.5, probe=True)
+    assert ("win_wait", 3) not in calls
+    assert calls[:3] == [("win_exists", None), ("win_activate", None), ("win_active", None)]
+
+
+def test_spent_deadline_checks_once(monkeypatch):
+    calls = _click(monkeypatch, timeout=0)
+    assert [name for name, _ in calls[:3]] == ["win_exists", "win_activate", "win_active"]
+    assert all(timeout is None for _, timeout in calls)
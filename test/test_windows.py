@@ -0,0 +1,57 @@
+import threading
+
+from automatic.selenium import Context, Title, Url, Xpath
+
+from benchmark.fakes import FakeDriver, FakeDocument, FakeElement
+
+
+def _context(windows=5, timeout=0.5):
+    driver = FakeDriver()
+    driver.open("main", FakeDocument("Main", "https://main"))
+    for i in range(windows):
+        driver.open(f"w{i}", FakeDocument(f"Other {i}", f"https://other/{i}"))
+    return driver, Context(driver, timeout=timeout, differ=0)
+
+
+def test_hit_without_switching():
+    driver, ctx = _context()
+    assert ctx.get_window_handle(Title("other", "Other 3")) == "w3"
+    driver.counts.clear()
+    assert ctx.get_window_handle(Title("other", "Other 3")) == "w3"
+    assert ctx.get_window_handle(Url("other", "https://other/1")) == "w1"
+    assert driver.counts["switchToWindow"] == 0
+
+
+def test_waiting_rescans_once_per_lookup():
+    driver, ctx = _context(windows=5, timeout=0.5)
+    ctx.get_window_handle(Title("main", "Main"))
+    driver.counts.clear()
+
+    assert ctx.get_window_handle(Title("missing", "Missing")) is None
+    # one rescan through the 6 windows and back, not one per poll
+    assert driver.counts["getWindowHandles"] > 2
+    assert driver.counts["switchToWindow"] <= 6
+
+
+def test_window_opened_while_waiting():
+    driver, ctx = _context(windows=2, timeout=2)
+    ctx.get_window_handle(Title("main", "Main"))
+    popup = FakeDocument("", "about:blank")
+    threading.Timer(0.1, lambda: driver.open("popup", popup)).start()
+    # the popup loads after it was indexed
+    threading.Timer(0.3, lambda: setattr(popup, "title", "Popup")).start()
+
+    assert ctx.get_window_handle(Title("popup", "Popup")) == "popup"
+
+
+def test_navigated_window_is_rechecked():
+    driver, ctx = _context(windows=2, timeout=0.3)
+    main = driver.windows["main"]
+    main.add("xpath", "//a", [FakeElement(driver, "a")])
+    assert ctx.get_window_handle(Title("other", "Other 1")) == "w1"
+
+    # a click may navigate any window, the old title isn't served anymore
+    driver.windows["w1"].title = "Renamed"
+    ctx.click(Xpath("link", "//a"))
+    assert ctx.get_window_handle(Title("other", "Other 1")) is None
+    assert ctx.get_window_handle(Title("renamed", "Renamed")) == "w1"